@@ -0,0 +1,120 @@
+"""
+Benchmark: memory and CPU of accumulating long reasoning traces across many sessions.
+
+Simulates N concurrent chat sessions (default 500) that each receive a long
+stream of reasoning steps, interleaved round-robin as a server would see
+them, and re-render the visible trace after every step. Compares:
+
+- concat: the previous pattern (`text += step`, then `.strip()` for display)
+- buffer: research_helpers.stream_buffer.StreamBuffer with its default caps
+- buffer+spill: the same, with dropped steps spilled to a temp directory
+
+For each it reports wall time (untraced), peak traced memory while all
+sessions are live and memory still held per session at the end
+(tracemalloc, in a second pass).
+
+To run (from the repository root):
+    $ python benchmarks/bench_stream_memory.py
+    $ python benchmarks/bench_stream_memory.py --sessions 500 --steps 1000 --step-chars 300
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_helpers.stream_buffer import StreamBuffer  # noqa: E402
+
+
+class ConcatSession:
+    """The old accumulation: one growing string, stripped for every render."""
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.rendered = ""
+
+    def add(self, step: str) -> None:
+        self.text += f"- {step}\n\n"
+        self.rendered = self.text.strip()
+
+    def close(self) -> None:
+        pass
+
+
+class BufferSession:
+    """The bounded accumulation used by the apps."""
+
+    def __init__(self, spill_dir=None) -> None:
+        self.buffer = StreamBuffer(spill_dir=spill_dir)
+        self.rendered = ""
+
+    def add(self, step: str) -> None:
+        self.buffer.append(f"- {step}")
+        self.rendered = self.buffer.text()
+
+    def close(self) -> None:
+        self.buffer.close()
+
+
+def stream(make_session, sessions: int, steps: int, step_chars: int) -> list:
+    """Stream `steps` steps into every session, round-robin; returns the live sessions."""
+    step_text = "x" * (step_chars - 8)
+    live = [make_session() for _ in range(sessions)]
+    for i in range(steps):
+        step = f"{i:06d} {step_text}"
+        for session in live:
+            session.add(step)
+    return live
+
+
+def run(make_session, sessions: int, steps: int, step_chars: int):
+    """Returns (seconds, peak bytes, held bytes); timed and traced in separate passes."""
+    start = time.perf_counter()
+    live = stream(make_session, sessions, steps, step_chars)
+    elapsed = time.perf_counter() - start
+    for session in live:
+        session.close()
+    del live
+
+    tracemalloc.start()
+    live = stream(make_session, sessions, steps, step_chars)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for session in live:
+        session.close()
+    return elapsed, peak, held
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=400, help="reasoning steps per session")
+    parser.add_argument("--step-chars", type=int, default=200, help="characters per step")
+    args = parser.parse_args()
+
+    spill_dir = tempfile.mkdtemp(prefix="stream-bench-")
+    strategies = [
+        ("concat", ConcatSession),
+        ("buffer", BufferSession),
+        ("buffer+spill", lambda: BufferSession(spill_dir)),
+    ]
+
+    trace_kb = args.steps * (args.step_chars + 4) / 1024
+    print(f"{args.sessions} sessions x {args.steps} steps x {args.step_chars} chars "
+          f"(full trace {trace_kb:.0f} KB per session)\n")
+    print(f"{'strategy':>14} {'seconds':>9} {'peak MB':>9} {'KB/session':>11}")
+    try:
+        for name, make_session in strategies:
+            elapsed, peak, held = run(make_session, args.sessions, args.steps, args.step_chars)
+            print(f"{name:>14} {elapsed:>9.2f} {peak / 2**20:>9.1f} {held / 1024 / args.sessions:>11.1f}")
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
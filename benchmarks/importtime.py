@@ -0,0 +1,80 @@
+"""
+Startup profiling for the demo entry points.
+
+Runs each app's module code (without starting its server) under
+`python -X importtime` in a fresh interpreter, writes the raw report to
+benchmarks/importtime/<app>.txt and prints a summary with the wall-clock
+startup time and the slowest top-level imports.
+
+To run (from the repository root, with each app's dependencies installed):
+    $ python benchmarks/importtime.py
+    $ python benchmarks/importtime.py roast_my_life gradio   # a subset
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_DIR = os.path.join(ROOT, "benchmarks", "importtime")
+
+# app name -> (script path, working directory)
+ENTRY_POINTS: Dict[str, Tuple[str, str]] = {
+    "roast_my_life": ("roast_my_life/src/app.py", "roast_my_life"),
+    "gradio": ("gradio/streaming_app.py", "gradio"),
+    "streamlit": ("streamlit/streaming_app.py", "streamlit"),
+    "event_finder": ("event_finder/app.py", "event_finder"),
+}
+
+# Executes the script as a module (not __main__) so servers are not launched.
+_RUNNER = (
+    "import runpy, sys; "
+    "sys.path.insert(0, sys.argv[1].rsplit('/', 1)[0]); "
+    "runpy.run_path(sys.argv[1], run_name='importtime')"
+)
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def profile(name: str, script: str, cwd: str) -> Tuple[float, List[Tuple[int, str]]]:
+    """Profile one entry point; returns (wall seconds, [(cumulative us, module)])."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", BASE_URL=os.environ.get("BASE_URL", "http://localhost:9"))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _RUNNER, os.path.join(ROOT, script)],
+        cwd=os.path.join(ROOT, cwd),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    report = proc.stderr
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(os.path.join(REPORT_DIR, f"{name}.txt"), "w") as f:
+        f.write(report)
+
+    # Top-level imports are the ones with a single space of indentation.
+    top_level = []
+    for line in report.splitlines():
+        match = _LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            top_level.append((int(match.group(2)), match.group(4)))
+    top_level.sort(reverse=True)
+    return wall, top_level
+
+
+def main(names: List[str]) -> None:
+    for name in names or list(ENTRY_POINTS):
+        script, cwd = ENTRY_POINTS[name]
+        wall, top_level = profile(name, script, cwd)
+        print(f"{name}: {wall * 1000:.0f} ms wall")
+        for cumulative, module in top_level[:8]:
+            print(f"    {cumulative / 1000:>8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,289 @@
+"""
+Benchmark: offline replay of streamed chat.completions chunks through the front ends.
+
+Each fixture in benchmarks/fixtures/ is a JSONL file with one streamed
+`chat.completion.chunk` per line (reasoning_steps, tool calls, content).
+The chunks are replayed, with no network, through the exact chunk handlers
+the apps run:
+
+- gradio: `reka_stream()` in gradio/streaming_app.py (the client is replaced
+  by one that returns the recorded chunks)
+- streamlit: `render_stream()` in streamlit/streaming_app.py
+- event_finder: `render_search_stream()` in event_finder/app.py
+
+`gradio` and `streamlit` are replaced by stubs that count UI calls and do
+nothing else, so only the apps' own per-chunk work is measured (the real
+packages need not be installed).
+
+For each app and fixture it reports chunks/sec, CPU time per chunk, peak
+traced memory, memory still held afterwards and the number of allocated
+blocks still held per chunk (tracemalloc, in a separate pass) and UI calls
+per chunk. `--compare` flags regressions in CPU time and in blocks per
+chunk.
+
+To run (from the repository root):
+    $ python benchmarks/replay_streams.py
+    $ python benchmarks/replay_streams.py --app gradio --runs 200
+    $ python benchmarks/replay_streams.py --save baseline.json
+    $ python benchmarks/replay_streams.py --compare baseline.json   # exit 1 on regression
+
+To record a real stream as a fixture (needs REKA_API_KEY and openai):
+    $ python benchmarks/replay_streams.py --record "Upcoming AI conferences" benchmarks/fixtures/my_stream.jsonl
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+# Fixtures replayed through each app by default.
+APP_FIXTURES = {
+    "gradio": ["research_stream.jsonl"],
+    "streamlit": ["research_stream.jsonl"],
+    "event_finder": ["event_search_stream.jsonl"],
+}
+
+_DELTA_FIELDS = ("role", "content", "reasoning_content", "reasoning_steps", "tool_calls")
+
+
+# -------- UI stubs --------
+class UICounter:
+    calls = 0
+
+
+class _Widget:
+    """Stands in for any Streamlit element or container: every call is counted and ignored."""
+
+    def __call__(self, *args, **kwargs):
+        UICounter.calls += 1
+        return self
+
+    def __getattr__(self, name):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __bool__(self):
+        # Inputs (chat_input, button, ...) read as empty, so no module-level flow runs.
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+
+def _stub_streamlit() -> types.ModuleType:
+    module = types.ModuleType("streamlit")
+    widget = _Widget()
+    module.__getattr__ = lambda name: widget
+    module.cache_resource = module.cache_data = lambda fn=None, **_: fn if fn else (lambda f: f)
+    return module
+
+
+def _stub_gradio() -> types.ModuleType:
+    module = types.ModuleType("gradio")
+
+    class ChatMessage:
+        def __init__(self, content="", metadata=None, **_):
+            self.content = content
+            self.metadata = metadata or {}
+
+    module.ChatMessage = ChatMessage
+    module.ChatInterface = lambda *args, **kwargs: _Widget()
+    return module
+
+
+def load_app(name: str, path: str, extra_path: str = None):
+    """Import an app file under a unique module name, with the UI stubs installed."""
+    sys.modules["streamlit"] = _stub_streamlit()
+    sys.modules["gradio"] = _stub_gradio()
+    if extra_path and extra_path not in sys.path:
+        sys.path.insert(0, extra_path)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# -------- fixtures --------
+def load_fixture(path: str) -> list:
+    """Recorded chunks as objects with the attribute shape of openai's stream chunks."""
+    chunks = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            raw = json.loads(line)
+            choices = []
+            for choice in raw.get("choices", []):
+                delta = {field: None for field in _DELTA_FIELDS}
+                delta.update(choice.get("delta") or {})
+                choices.append(SimpleNamespace(index=choice.get("index", 0), delta=SimpleNamespace(**delta)))
+            chunks.append(SimpleNamespace(choices=choices))
+    return chunks
+
+
+def record_fixture(prompt: str, path: str) -> None:
+    """Stream one real research request and write its chunks to `path`."""
+    from openai import OpenAI
+
+    client = OpenAI(base_url="https://api.reka.ai/v1", api_key=os.environ["REKA_API_KEY"])
+    stream = client.chat.completions.create(
+        model="reka-flash-research",
+        messages=[{"role": "user", "content": prompt}],
+        stream=True,
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in stream:
+            f.write(json.dumps(chunk.model_dump(exclude_none=True)) + "\n")
+    print(f"wrote {path}")
+
+
+# -------- app drivers: each returns a function that replays a list of chunks --------
+def gradio_driver():
+    app = load_app("gradio_streaming_app", os.path.join(ROOT, "gradio", "streaming_app.py"))
+
+    def replay(chunks):
+        completions = SimpleNamespace(create=lambda **kwargs: iter(chunks))
+        app._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        for _ in app.reka_stream("replay", None):
+            UICounter.calls += 1  # every yield re-renders the chat message
+
+    return replay
+
+
+def streamlit_driver():
+    app = load_app("streamlit_streaming_app", os.path.join(ROOT, "streamlit", "streaming_app.py"))
+    steps_box = _Widget()
+    return lambda chunks: app.render_stream(iter(chunks), steps_box)
+
+
+def event_finder_driver():
+    app_dir = os.path.join(ROOT, "event_finder")
+    app = load_app("event_finder_app", os.path.join(app_dir, "app.py"), extra_path=app_dir)
+    # Finished searches are cached; keep replayed ones in this process instead
+    # of writing them to the backend configured by CACHE_BACKEND.
+    from research_helpers.cache import MemoryCache
+
+    events = MemoryCache().namespace("events")
+    app.get_event_cache = lambda: events
+    placeholder = _Widget()
+    return lambda chunks: app.render_search_stream(iter(chunks), placeholder, "replay")
+
+
+DRIVERS = {"gradio": gradio_driver, "streamlit": streamlit_driver, "event_finder": event_finder_driver}
+
+
+# -------- measurement --------
+def measure(replay, chunks: list, runs: int) -> dict:
+    """Median throughput and CPU over `runs` replays, then one traced replay for memory."""
+    replay(chunks)  # warm up (imports, caches)
+    walls, cpus = [], []
+    UICounter.calls = 0
+    for _ in range(runs):
+        wall, cpu = time.perf_counter(), time.process_time()
+        replay(chunks)
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    ui_calls = UICounter.calls / runs
+
+    gc.collect()
+    tracemalloc.start()
+    replay(chunks)
+    gc.collect()  # count only what the handler keeps, not uncollected cycles
+    retained, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+
+    n = len(chunks)
+    return {
+        "chunks": n,
+        "chunks_per_s": n / statistics.median(walls),
+        "cpu_us_per_chunk": statistics.median(cpus) / n * 1e6,
+        "peak_kb": peak / 1024,
+        "retained_kb": retained / 1024,
+        "blocks_per_chunk": blocks / n,
+        "ui_calls_per_chunk": ui_calls / n,
+    }
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> bool:
+    """Print CPU and block changes per chunk against a saved run; False if any exceeds `tolerance`."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    ok = True
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        # Increases under `floor` are ignored: a few blocks of interpreter caches vary between runs.
+        for metric, unit, floor in (("cpu_us_per_chunk", "us/chunk", 0.0), ("blocks_per_chunk", "blocks/chunk", 0.25)):
+            if metric not in baseline[key]:
+                continue
+            before, after = baseline[key][metric], result[metric]
+            change = after / before - 1 if before else 0.0
+            regressed = change > tolerance and after - before > floor
+            ok &= not regressed
+            print(f"{key:>40} {before:>9.2f} -> {after:>9.2f} {unit:<12} ({change:+.0%})"
+                  f"{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--app", choices=sorted(DRIVERS), action="append", help="app(s) to replay (default: all)")
+    parser.add_argument("--fixture", action="append", help="fixture file(s) to replay instead of the defaults")
+    parser.add_argument("--runs", type=int, default=50, help="timed replays per app and fixture")
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="compare CPU and blocks per chunk against saved results")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed increase per chunk for --compare")
+    parser.add_argument("--record", nargs=2, metavar=("PROMPT", "FILE"), help="record a real stream as a fixture")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixture(*args.record)
+        return
+
+    results = {}
+    out = sys.stdout
+    print(f"{'app':>13} {'fixture':>26} {'chunks':>7} {'chunks/s':>10} {'CPU us/chunk':>13} "
+          f"{'peak KB':>9} {'held KB':>9} {'blocks/chunk':>13} {'UI calls/chunk':>15}")
+    # The handlers may print (gradio logs every tool call); keep that out of the report.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for app in args.app or list(DRIVERS):
+            replay = DRIVERS[app]()
+            for fixture in args.fixture or APP_FIXTURES[app]:
+                path = fixture if os.path.exists(fixture) else os.path.join(FIXTURES, fixture)
+                r = measure(replay, load_fixture(path), args.runs)
+                results[f"{app}:{os.path.basename(path)}"] = r
+                print(f"{app:>13} {os.path.basename(path):>26} {r['chunks']:>7} {r['chunks_per_s']:>10.0f} "
+                      f"{r['cpu_us_per_chunk']:>13.1f} {r['peak_kb']:>9.1f} {r['retained_kb']:>9.1f} "
+                      f"{r['blocks_per_chunk']:>13.2f} {r['ui_calls_per_chunk']:>15.2f}", file=out)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
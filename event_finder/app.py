@@ -11,11 +11,22 @@ Key features showcased:
 Developers can use this as a template to build domain-specific search experiences that return structured data
 for rendering event listings or other content.
 """
+import hashlib
+import html
 import json
 import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import streamlit as st
-from openai import OpenAI
+
+from events import EVENT_LIST_SCHEMA, Event, parse_event_list
+
+# Shared helpers (e.g. the client-side rate limiter) live in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_helpers.stream_buffer import stream_buffer_from_env  # noqa: E402
 
 # Page configuration
 st.set_page_config(page_title="Event Finder", page_icon="📅", layout="centered")
@@ -62,10 +73,51 @@ st.markdown(
 # API Key input
 api_key = os.getenv("REKA_API_KEY")
 
-client = OpenAI(
-    base_url="https://api.reka.ai/v1",
-    api_key=api_key,
-)
+
+@st.cache_resource
+def get_client():
+    # Imported lazily so the page renders before the openai SDK is loaded.
+    from openai import OpenAI
+    from research_helpers.ratelimit import rate_limited_http_client
+
+    return OpenAI(
+        base_url="https://api.reka.ai/v1",
+        api_key=api_key,
+        http_client=rate_limited_http_client(),
+    )
+
+# Cache of finished searches (in-memory by default; set CACHE_BACKEND=disk or redis
+# to share it between processes and replicas, see research_helpers/cache.py).
+EVENT_CACHE_TTL = float(os.getenv("EVENT_CACHE_TTL", "3600"))
+
+
+@st.cache_resource
+def get_event_cache():
+    from research_helpers.cache import create_cache_from_env
+
+    return create_cache_from_env().namespace("events", ttl=EVENT_CACHE_TTL)
+
+
+def search_cache_key(prompt: str, search_config: dict, shards: list) -> str:
+    """Stable key for a search: the prompt, the search config and the shard layout."""
+    raw = json.dumps([prompt.strip(), search_config, shards], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def cache_events(key: str, events: list, rejected: int) -> None:
+    get_event_cache().set(key, {
+        "events": [{"title": e.title, "date": e.date, "url": e.url} for e in events],
+        "rejected": rejected,
+    })
+
+
+def cached_events(key: str):
+    """Return (events, rejected) for a cached search, or None."""
+    entry = get_event_cache().get(key)
+    if entry is None:
+        return None
+    return [Event(**fields) for fields in entry["events"]], entry["rejected"]
+
 
 # Event search input
 user_prompt = st.text_area(
@@ -92,37 +144,39 @@ elif search_scope == "Block specific domains":
         placeholder="spam-events.com\nlow-quality-site.com",
     )
 
+# Optional fan-out: run several smaller searches concurrently and merge them.
+# At most MAX_SHARDS searches run at once, however many sub-queries are given.
+MAX_SHARDS = 8
+fan_out = st.checkbox(
+    "Parallel search",
+    help="Split the search into shards that run concurrently, then merge and de-duplicate the events.",
+)
+shard_count = 1
+sub_queries_input = ""
+if fan_out:
+    if search_scope == "Allowed domains only":
+        shard_count = st.slider("Number of shards (allowed domains are split between them)", 2, MAX_SHARDS, 4)
+    else:
+        sub_queries_input = st.text_area(
+            "Sub-queries (one per line, each runs as its own search)",
+            placeholder="Tech conferences in San Francisco this month\nAI meetups in San Francisco this month",
+        )
+
 
 # Function to make API call
-def search_events(prompt: str, search_config: dict):
+# Set raise_errors=True when calling from a worker thread, where st.error is not available,
+# and pass a client created on the main thread (st.cache_resource needs the script context).
+def search_events(prompt: str, search_config: dict, raise_errors: bool = False, client=None):
     # Define the expected structured output format using JSON Schema.
     # This ensures that the model returns a well-structured list of events with title, date, and URL.
-    # For more information on JSON Schema, see https://docs.reka.ai/research/structured-output
+    # The schema itself lives in events.py, where it is also compiled into the validator
+    # used to check the events that come back.
     response_format = {
         "type": "json_schema",
         "json_schema": {
             "name": "event_list",
             "strict": True,
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "events": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "title": {"type": "string"},
-                                "date": {"type": "string" },
-                                "url": {"type": "string"},
-                            },
-                            "required": ["title", "date", "url"],
-                            "additionalProperties": False,
-                        },
-                    }
-                },
-                "required": ["events"],
-                "additionalProperties": False,
-            },
+            "schema": EVENT_LIST_SCHEMA,
         },
     }
 
@@ -145,7 +199,7 @@ def search_events(prompt: str, search_config: dict):
     # }
     
     try:
-        stream = client.chat.completions.create(
+        stream = (client or get_client()).chat.completions.create(
             model="reka-flash-research",
             messages=[{"role": "user", "content": prompt}],
             response_format=response_format,
@@ -156,39 +210,163 @@ def search_events(prompt: str, search_config: dict):
         )
         return stream
     except Exception as e:
+        if raise_errors:
+            raise
         st.error(f"API request failed: {str(e)}")
         return None
 
 
 # Function to display events
-def display_events(events_data):
-    if not events_data or "events" not in events_data:
-        st.warning("No events found matching your criteria.")
-        return
-
-    events = events_data["events"]
+def display_events(events, rejected: int = 0):
+    if rejected:
+        st.caption(f"Skipped {rejected} malformed events.")
 
     if not events:
         st.warning("No events found matching your criteria.")
-        st.markdown(events_data)
         return
 
     st.success(f"Found {len(events)} events!")
 
     # Display events in a visually appealing format
     for event in events:
+        url = html.escape(event.url or "#", quote=True)
         st.markdown(
             f"""
         <div class="event-card">
-            <div class="event-title">{event.get('title', 'Untitled Event')}</div>
-            <div class="event-date">{event.get('date', 'Date TBD')}</div>
-            <a href="{event.get('url', '#')}" target="_blank" class="event-url">{event.get('url', 'No url found.')}</a>
+            <div class="event-title">{html.escape(event.title)}</div>
+            <div class="event-date">{html.escape(event.date or 'Date TBD')}</div>
+            <a href="{url}" target="_blank" class="event-url">{html.escape(event.url or 'No url found.')}</a>
         </div>
         """,
             unsafe_allow_html=True,
         )
 
 
+# Fan-out helpers: split one search into shards, run them concurrently and merge the events.
+def build_shards(prompt: str, search_config: dict, shard_count: int, sub_queries: list):
+    """Return a list of (prompt, search_config) pairs, one per concurrent search."""
+    if sub_queries:
+        return [(query, search_config) for query in sub_queries]
+
+    domains = search_config.get("allowed_domains", [])
+    shard_count = max(1, min(shard_count, len(domains)))
+    if shard_count < 2:
+        return [(prompt, search_config)]
+    # Round-robin so every shard gets a similar number of domains.
+    return [
+        (prompt, {**search_config, "allowed_domains": domains[i::shard_count]})
+        for i in range(shard_count)
+    ]
+
+
+def parse_answer(answer_parts: list):
+    """Parse a search's answer, streamed in one or more content deltas, into (events, rejected count).
+
+    Raises json.JSONDecodeError if the joined answer is not valid JSON.
+    """
+    content = "".join(answer_parts)
+    return parse_event_list(json.loads(content)) if content else ([], 0)
+
+
+def run_shard(prompt: str, search_config: dict, client):
+    """Run one search to completion (in a worker thread); returns (events, rejected count)."""
+    stream = search_events(prompt, search_config, raise_errors=True, client=client)
+    answer_parts = []
+    for chunk in stream:
+        delta = chunk.choices[0].delta
+        if delta and delta.content:
+            answer_parts.append(delta.content)
+    return parse_answer(answer_parts)
+
+
+def _normalize_url(url: str) -> str:
+    url = re.sub(r"^https?://(www\.)?", "", (url or "").strip().lower())
+    return url.split("#")[0].rstrip("/")
+
+
+def merge_events(event_lists: list):
+    """Merge shard results, dropping duplicates by URL or by title + date, sorted by date."""
+    merged, seen = [], set()
+    for events in event_lists:
+        for event in events:
+            url_key = _normalize_url(event.url)
+            title_key = (re.sub(r"\W+", " ", event.title.lower()).strip(), event.start or event.date)
+            if (url_key and url_key in seen) or title_key in seen:
+                continue
+            if url_key:
+                seen.add(url_key)
+            seen.add(title_key)
+            merged.append(event)
+    return sorted(merged, key=lambda event: event.sort_key())
+
+
+def search_events_fan_out(shards: list):
+    """Run shards concurrently, re-rendering the merged events as each one finishes.
+
+    Returns (events, rejected count, number of failed shards).
+    """
+    status = st.empty()
+    results_placeholder = st.empty()
+    shard_events = []
+    rejected = 0
+    failed = 0
+    done = 0
+    client = get_client()
+    with ThreadPoolExecutor(max_workers=min(len(shards), MAX_SHARDS)) as pool:
+        futures = [pool.submit(run_shard, prompt, config, client) for prompt, config in shards]
+        for future in as_completed(futures):
+            done += 1
+            try:
+                events, shard_rejected = future.result()
+                shard_events.append(events)
+                rejected += shard_rejected
+            except Exception as e:
+                failed += 1
+                st.error(f"A search shard failed: {str(e)}")
+            status.info(f"{done}/{len(shards)} searches finished")
+            with results_placeholder.container():
+                display_events(merge_events(shard_events), rejected)
+    status.empty()
+    return merge_events(shard_events), rejected, failed
+
+
+def render_search_stream(stream, reasoning_placeholder, cache_key: str) -> None:
+    """Show streamed reasoning steps in `reasoning_placeholder`, then display and cache the events."""
+    # Bounded: long runs show only the most recent steps (see STREAM_BUFFER_*).
+    stream_buffer = stream_buffer_from_env()
+    answer_parts = []
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta
+            if not delta:
+                continue
+
+            if delta.reasoning_steps:
+                for step in delta.reasoning_steps:
+                    if step.get("reasoning_content"):
+                        stream_buffer.append(step["reasoning_content"])
+                        reasoning_placeholder.markdown(stream_buffer.text())
+                    if step.get("content"):
+                        stream_buffer.append("Executed " + step["content"].get("tool_name"))
+                        reasoning_placeholder.markdown(stream_buffer.text())
+
+            # The JSON answer may be split over several deltas; parse it once complete.
+            if delta.content:
+                answer_parts.append(delta.content)
+
+        if answer_parts:
+            try:
+                events, rejected = parse_answer(answer_parts)
+                display_events(events, rejected)
+                cache_events(cache_key, events, rejected)
+            except json.JSONDecodeError:
+                st.error("Received malformed JSON response. Please try again.")
+    except Exception as e:
+        st.error(f"An error occurred while processing the response: {str(e)}")
+    finally:
+        stream_buffer.close()
+
+
 # Search button and results
 if st.button("Find Events", type="primary", use_container_width=True):
     if not user_prompt.strip():
@@ -212,33 +390,26 @@ if st.button("Find Events", type="primary", use_container_width=True):
             ]
             search_config["blocked_domains"] = domains
 
-        stream = search_events(user_prompt, search_config)
+        sub_queries = [q.strip() for q in sub_queries_input.strip().split("\n") if q.strip()]
+        shards = build_shards(user_prompt, search_config, shard_count, sub_queries) if fan_out else []
+
+        cache_key = search_cache_key(user_prompt, search_config, shards)
+        cached = cached_events(cache_key)
+
+        if cached is not None:
+            st.caption("Showing cached results for this search.")
+            display_events(*cached)
+            stream = None
+        elif len(shards) > 1:
+            events, rejected, failed = search_events_fan_out(shards)
+            if not failed:
+                cache_events(cache_key, events, rejected)
+            stream = None
+        else:
+            stream = search_events(user_prompt, search_config)
 
         if stream:
             # with st.spinner("Finding events...", show_time=True):
             reasoning_box = st.expander("Reasoning steps", expanded=True)
             reasoning_placeholder = reasoning_box.empty()
-            stream_buffer = ""
-            try:
-                for chunk in stream:
-                    delta = chunk.choices[0].delta
-                    if not delta:
-                        continue
-
-                    if delta.reasoning_steps:
-                        for step in delta.reasoning_steps:
-                            if step.get("reasoning_content"):
-                                stream_buffer += "\n\n" + step["reasoning_content"]
-                                reasoning_placeholder.markdown(stream_buffer)
-                            if step.get("content"):
-                                stream_buffer += "\n\nExecuted " + step["content"].get("tool_name")
-                                reasoning_placeholder.markdown(stream_buffer)
-
-                    if delta.content:
-                        try:
-                            events_data = json.loads(delta.content)
-                            display_events(events_data)
-                        except json.JSONDecodeError:
-                            st.error("Received malformed JSON response. Please try again.")
-            except Exception as e:
-                st.error(f"An error occurred while processing the response: {str(e)}")
+            render_search_stream(stream, reasoning_placeholder, cache_key)
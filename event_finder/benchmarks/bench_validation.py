@@ -0,0 +1,111 @@
+"""
+Benchmark: validating large synthetic event lists.
+
+Generates `event_list` payloads of 1,000 / 10,000 / 100,000 events (about 5%
+malformed) and compares:
+
+- parse_event_list: the compiled validator + Event objects used by the app
+- jsonschema: Draft 7 validation of the same payload (if installed; it only
+  checks, it does not repair or build objects)
+- pydantic: a TypeAdapter over a list of models (if installed)
+
+It also reports memory per event for Event (__slots__) vs the decoded dict.
+
+To run (from the event_finder folder):
+    $ python benchmarks/bench_validation.py
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from events import EVENT_LIST_SCHEMA, parse_event_list  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def make_payload(size: int, seed: int = 0) -> str:
+    """JSON text of an event_list with some malformed or repairable items."""
+    rng = random.Random(seed)
+    events = []
+    for i in range(size):
+        event = {
+            "title": f"Conference #{i}",
+            "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "url": f"https://events.example.com/{i}",
+        }
+        roll = rng.random()
+        if roll < 0.02:
+            event["title"] = ""  # rejected
+        elif roll < 0.03:
+            event = ["not", "an", "object"]  # rejected
+        elif roll < 0.04:
+            event["url"] = f"events.example.com/{i}"  # repaired
+        elif roll < 0.05:
+            event["date"] = f"July {rng.randint(1, 28)}, 2025"  # parsed
+        events.append(event)
+    return json.dumps({"events": events})
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_jsonschema(payload):
+    try:
+        import jsonschema
+    except ImportError:
+        return None
+    validator = jsonschema.Draft7Validator(EVENT_LIST_SCHEMA)
+    return timed(lambda p: sum(1 for _ in validator.iter_errors(p)), payload)[0]
+
+
+def bench_pydantic(payload):
+    try:
+        from pydantic import BaseModel, TypeAdapter
+    except ImportError:
+        return None
+
+    class Event(BaseModel):
+        title: str
+        date: str
+        url: str
+
+    adapter = TypeAdapter(list[Event])
+    items = [item for item in payload["events"] if isinstance(item, dict)]
+    return timed(adapter.validate_python, items)[0]
+
+
+def memory_per_item(build) -> float:
+    tracemalloc.start()
+    objs = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / max(1, len(objs))
+
+
+def main() -> None:
+    print(f"{'events':>8} {'parse ms':>9} {'valid':>7} {'rejected':>8} {'jsonschema ms':>14} {'pydantic ms':>12}")
+    for size in SIZES:
+        payload = json.loads(make_payload(size))
+        elapsed, (events, rejected) = timed(parse_event_list, payload)
+        js = bench_jsonschema(payload)
+        pd = bench_pydantic(payload)
+        fmt = lambda t: f"{t * 1000:.1f}" if t is not None else "n/a"  # noqa: E731
+        print(f"{size:>8} {elapsed * 1000:>9.1f} {len(events):>7} {rejected:>8} {fmt(js):>14} {fmt(pd):>12}")
+
+    text = make_payload(10_000)
+    dict_bytes = memory_per_item(lambda: json.loads(text)["events"])
+    event_bytes = memory_per_item(lambda: parse_event_list(json.loads(text))[0])
+    print(f"\nmemory per item (10,000 events): dict {dict_bytes:.0f} B, Event {event_bytes:.0f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Typed event models and schema validation for the Event Finder structured output.
+
+`EVENT_LIST_SCHEMA` is the JSON Schema sent as `response_format`. It is
+compiled once at import into a plain Python checker (`validate_event`), so
+validating a streamed response is a single pass over the items with no
+schema interpretation per event. Valid items become compact `Event` objects
+(`__slots__`, date parsed once); items that can be fixed cheaply are repaired
+and the rest are rejected.
+"""
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# JSON Schema for the structured output: a list of events with title, date, and URL.
+# For more information on JSON Schema, see https://docs.reka.ai/research/structured-output
+EVENT_LIST_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "events": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "date": {"type": "string"},
+                    "url": {"type": "string"},
+                },
+                "required": ["title", "date", "url"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["events"],
+    "additionalProperties": False,
+}
+
+_DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y", "%m/%d/%Y", "%Y-%m")
+
+
+@lru_cache(maxsize=4096)
+def parse_event_date(value: str) -> Optional[date]:
+    """Parse the common date formats returned by the model; None if unknown.
+
+    Results are memoized since many events share the same date string.
+    """
+    value = value.strip()
+    try:
+        # ISO dates, possibly followed by a time or a range ("2025-07-10 to 2025-07-12")
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class Event:
+    """One validated event. `start` is the parsed date, or None if unparseable."""
+
+    __slots__ = ("title", "date", "url", "start")
+
+    def __init__(self, title: str, date: str, url: str) -> None:
+        self.title = title
+        self.date = date
+        self.url = url
+        self.start = parse_event_date(date) if date else None
+
+    def sort_key(self) -> Tuple[int, date, str]:
+        """Events with a known date first, in date order, then the rest by date text."""
+        if self.start is not None:
+            return (0, self.start, "")
+        return (1, date.max, self.date)
+
+    def __repr__(self) -> str:
+        return f"Event(title={self.title!r}, date={self.date!r}, url={self.url!r})"
+
+
+def compile_item_validator(item_schema: Dict[str, Any]) -> Callable[[Any], Optional[Dict[str, str]]]:
+    """Compile an object-of-strings item schema into a checker function.
+
+    Supports the subset of JSON Schema used by `EVENT_LIST_SCHEMA`: an object
+    with string properties, `required` and `additionalProperties: false`.
+
+    The returned function takes one decoded item and returns a dict with
+    exactly the schema's properties, or None if the item must be rejected.
+    Repairs applied: numbers are turned into strings, surrounding whitespace
+    is stripped, unknown keys are dropped and missing or null fields become
+    "". An item is rejected when it is not an object, holds a non-scalar
+    value, or has an empty first required property (the title).
+    """
+    properties = tuple(item_schema["properties"])
+    required = item_schema.get("required", [])
+    primary = required[0] if required else properties[0]
+
+    def validate(item: Any) -> Optional[Dict[str, str]]:
+        if not isinstance(item, dict):
+            return None
+        out = {}
+        for name in properties:
+            value = item.get(name)
+            if value is None:
+                value = ""
+            elif not isinstance(value, str):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    return None
+                value = str(value)
+            out[name] = value.strip()
+        if not out[primary]:
+            return None
+        return out
+
+    return validate
+
+
+validate_event = compile_item_validator(EVENT_LIST_SCHEMA["properties"]["events"]["items"])
+
+_SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*://", re.IGNORECASE)
+
+
+def parse_event_list(payload: Any) -> Tuple[List[Event], int]:
+    """Validate a decoded `event_list` response into Event objects.
+
+    Parameters:
+        payload: The result of `json.loads` on the model's content.
+
+    Returns:
+        Tuple[List[Event], int]: The valid (or repaired) events and the
+        number of rejected items.
+    """
+    items = payload.get("events") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return [], 0
+
+    events, rejected = [], 0
+    for item in items:
+        fields = validate_event(item)
+        if fields is None:
+            rejected += 1
+            continue
+        url = fields["url"]
+        if url and not _SCHEME.match(url):
+            url = "https://" + url
+        events.append(Event(fields["title"], fields["date"], url))
+    return events, rejected
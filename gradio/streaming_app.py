@@ -12,24 +12,44 @@ Environment:
     - Set REKA_API_KEY in your environment variables with your Reka API key.
 """
 
-import json
 import os
+import sys
 import time
 
-from openai import OpenAI
-
 import gradio as gr
 from gradio import ChatMessage
 
+# Shared helpers (e.g. the client-side rate limiter) live in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_helpers.stream_buffer import stream_buffer_from_env  # noqa: E402
+
 # -------- Reka / OpenAI client setup --------
 API_KEY = os.getenv("REKA_API_KEY", "your_api_key_here")
-client = OpenAI(
-    base_url="https://api.reka.ai/v1",
-    api_key=API_KEY,
-)
-
 MODEL = "reka-flash-research"
 
+_client = None
+
+
+def get_client():
+    """
+    Create the OpenAI client on first use.
+
+    The openai SDK is imported here rather than at module level so the UI
+    starts without paying for it until the first message is sent.
+    """
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        from research_helpers.ratelimit import rate_limited_http_client
+
+        _client = OpenAI(
+            base_url="https://api.reka.ai/v1",
+            api_key=API_KEY,
+            http_client=rate_limited_http_client(),
+        )
+    return _client
+
 
 # -------- Chat handler --------
 def reka_stream(message: str, _):
@@ -37,6 +57,10 @@ def reka_stream(message: str, _):
     Stream assistant reasoning + final answer in two phases:
     1. A 'Thinking' message that is updated in‑place with bullet‑point reasoning steps
     2. The assistant's final answer once streaming is complete
+
+    Reasoning steps are kept in a bounded StreamBuffer (see STREAM_BUFFER_* in
+    research_helpers/stream_buffer.py): long runs show only the most recent
+    steps, so a session's memory does not grow with the length of the trace.
     """
     start_time = time.time()
 
@@ -48,43 +72,49 @@ def reka_stream(message: str, _):
     yield thinking_msg
 
     # --- call Reka API ---
-    stream = client.chat.completions.create(
+    stream = get_client().chat.completions.create(
         model=MODEL,
         messages=[{"role": "user", "content": message}],
         stream=True,
     )
 
-    accumulated_reasoning = ""
-    final_answer = ""
-
-    for chunk in stream:
-        delta = chunk.choices[0].delta
-
-        # accumulate reasoning lines (either from reasoning_steps or reasoning_content)
-        if delta.reasoning_steps:
-            step = delta.reasoning_steps[-1]
-            if step.get("reasoning_content"):
-                accumulated_reasoning += f"- {step['reasoning_content'].strip()}\n\n"
-                thinking_msg.content = accumulated_reasoning.strip()
-                yield thinking_msg
-            if step.get("tool_calls"):
-                for tool_call in step["tool_calls"]:
-                    print(tool_call)
-                    if tool_call.get("name") == "search_web":
-                        accumulated_reasoning += f"- Searching the web for: \"{tool_call.get('args', {}).get('query', '')}\"\n\n"
-                    elif tool_call.get("name") == "analyze":
-                        accumulated_reasoning += f"- Analyzing webpages: \"{tool_call.get('args', {}).get('urls', '')}\"\n\n"
-                thinking_msg.content = accumulated_reasoning.strip()
+    reasoning = stream_buffer_from_env(collapsed_note="- _{count} earlier steps not shown_")
+    answer_parts = []
+
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta
+
+            # accumulate reasoning lines (either from reasoning_steps or reasoning_content)
+            if delta.reasoning_steps:
+                step = delta.reasoning_steps[-1]
+                if step.get("reasoning_content"):
+                    reasoning.append(f"- {step['reasoning_content'].strip()}")
+                    thinking_msg.content = reasoning.text()
+                    yield thinking_msg
+                if step.get("tool_calls"):
+                    for tool_call in step["tool_calls"]:
+                        print(tool_call)
+                        if tool_call.get("name") == "search_web":
+                            reasoning.append(f"- Searching the web for: \"{tool_call.get('args', {}).get('query', '')}\"")
+                        elif tool_call.get("name") == "analyze":
+                            reasoning.append(f"- Analyzing webpages: \"{tool_call.get('args', {}).get('urls', '')}\"")
+                    thinking_msg.content = reasoning.text()
+                    yield thinking_msg
+
+            elif delta.reasoning_content:
+                reasoning.append(f"- {delta.reasoning_content.strip()}")
+                thinking_msg.content = reasoning.text()
                 yield thinking_msg
 
-        elif delta.reasoning_content:
-            accumulated_reasoning += f"- {delta.reasoning_content.strip()}\n\n"
-            thinking_msg.content = accumulated_reasoning.strip()
-            yield thinking_msg
+            # accumulate final natural‑language answer (joined once at the end)
+            if delta.content:
+                answer_parts.append(delta.content)
+    finally:
+        # Runs even if the client disconnects mid-stream (the generator is closed).
+        reasoning.close()
 
-        # accumulate final natural‑language answer
-        if delta.content:
-            final_answer += delta.content
+    final_answer = "".join(answer_parts)
 
     # mark thinking complete
     thinking_msg.metadata["status"] = "done"
@@ -0,0 +1,33 @@
+"""
+Small helpers for running Reka Research from notebooks.
+
+The names below are loaded on first use (PEP 562 module `__getattr__`), so
+importing a submodule such as `research_helpers.stream_buffer` does not pay
+for `parallel` and its rate limiter.
+"""
+
+import importlib
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    "ResearchRun": "parallel",
+    "research_many_httpx": "parallel",
+    "research_many_openai": "parallel",
+    "summary_records": "parallel",
+    "to_dataframe": "parallel",
+    "to_records": "parallel",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,422 @@
+"""
+Pluggable cache with in-memory, on-disk and Redis backends.
+
+All backends share one interface: values are JSON-serializable, keys live
+in namespaces (`cache.namespace("roasts", ttl=3600)`), entries can expire,
+and `invalidate()` deletes an entry and broadcasts the invalidation so other
+processes can drop anything they derived from it.
+
+- MemoryCache: a dict in this process; invalidations reach local subscribers.
+- DiskCache: a SQLite file shared by the processes on one host.
+- RedisCache: any Redis-protocol server shared by every replica; invalidations
+  are sent over pub/sub. Requires `pip install redis` (or pass a `fakeredis`
+  client for local testing).
+
+Expired entries are also swept from the memory and disk backends while
+writing (at most once per SWEEP_INTERVAL), and the memory backend holds at
+most CACHE_MAX_ENTRIES entries, dropping the oldest, so keys that are never
+read again do not accumulate. Redis expires keys itself.
+
+A cache is an optimization, never a dependency: when the SQLite file or the
+Redis server fails, reads are misses and writes are dropped, so callers fall
+back to the upstream API instead of failing. Redis is skipped for a few
+seconds after an error, and the pub/sub listener is (re)started lazily.
+
+Also used by the roast_my_life app, whose image is built from the
+repository root so it can include this package.
+
+Environment Variables (see create_cache_from_env):
+    CACHE_BACKEND: "memory" (default), "disk" or "redis".
+    CACHE_PATH: SQLite file for the disk backend.
+    REDIS_URL: Connection URL for the redis backend.
+    CACHE_PREFIX: Prefix for every key, to share one server between apps.
+    CACHE_MAX_ENTRIES: Entry limit of the memory backend (default 10000).
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+InvalidationCallback = Callable[[str, Optional[str]], None]
+
+# Seconds between sweeps of expired entries (memory and disk backends).
+SWEEP_INTERVAL = 60.0
+
+
+class Cache:
+    """Base class: namespacing, TTL defaults and invalidation fan-out.
+
+    Backends implement `_get`, `_set`, `_add`, `_delete`, `_delete_prefix`
+    and may override `_delete_prefixes` (to clear many namespaces in one pass)
+    and `_publish` (to reach other processes).
+    """
+
+    def __init__(self, prefix: str = "") -> None:
+        self.prefix = prefix
+        self._subscribers: List[InvalidationCallback] = []
+
+    # -- backend primitives --
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        raise NotImplementedError
+
+    def _add(self, key: str, value: Any, ttl: Optional[float]) -> bool:
+        raise NotImplementedError
+
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def _delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    def _delete_prefixes(self, prefixes: List[str]) -> None:
+        for prefix in prefixes:
+            self._delete_prefix(prefix)
+
+    def _publish(self, namespace: str, key: Optional[str]) -> None:
+        self._notify(namespace, key)
+
+    # -- public API --
+    def namespace(self, name: str, ttl: Optional[float] = None) -> "CacheNamespace":
+        """A view of this cache whose keys are prefixed with `name`."""
+        return CacheNamespace(self, name, ttl)
+
+    def full_key(self, namespace: str, key: str = "") -> str:
+        return f"{self.prefix}{namespace}:{key}"
+
+    def clear_namespaces(self, names: Iterable[str]) -> None:
+        """Delete every key of several namespaces in one pass, without notifying subscribers."""
+        prefixes = [self.full_key(name) for name in names]
+        if prefixes:
+            self._delete_prefixes(prefixes)
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        """Call `callback(namespace, key)` on every invalidation (key None = whole namespace)."""
+        self._subscribers.append(callback)
+
+    def _notify(self, namespace: str, key: Optional[str]) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(namespace, key)
+            except Exception:
+                pass
+
+
+class CacheNamespace:
+    """Keys of one namespace, with a default TTL."""
+
+    def __init__(self, cache: Cache, name: str, ttl: Optional[float]) -> None:
+        self.cache = cache
+        self.name = name
+        self.ttl = ttl
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.cache._get(self.cache.full_key(self.name, key))
+        return default if value is None else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store `value` for `ttl` seconds (default: the namespace TTL; 0 = never expires)."""
+        self.cache._set(self.cache.full_key(self.name, key), value, ttl if ttl is not None else self.ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store `value` only if `key` is absent; True if it was stored.
+
+        Atomic across processes for the disk and Redis backends, so it can be
+        used to claim work. If the backend is failing it returns True.
+        """
+        return self.cache._add(self.cache.full_key(self.name, key), value, ttl if ttl is not None else self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.cache._delete(self.cache.full_key(self.name, key))
+
+    def clear(self) -> None:
+        self.cache._delete_prefix(self.cache.full_key(self.name))
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Delete `key` (or the whole namespace) and notify every subscriber, on every replica."""
+        if key is None:
+            self.clear()
+        else:
+            self.delete(key)
+        self.cache._publish(self.name, key)
+
+
+class MemoryCache(Cache):
+    """Per-process cache backed by a dict, holding at most `max_entries` (oldest written first out)."""
+
+    def __init__(self, prefix: str = "", max_entries: int = 10000) -> None:
+        super().__init__(prefix)
+        self.max_entries = max(1, max_entries)
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.time() + SWEEP_INTERVAL
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        """Write an entry, then sweep expired entries and enforce max_entries. Call with the lock held."""
+        now = time.time()
+        # Re-insert so dict order is write order and the oldest entry is first.
+        self._data.pop(key, None)
+        self._data[key] = (now + ttl if ttl else 0.0, value)
+        if now >= self._next_sweep:
+            self._next_sweep = now + SWEEP_INTERVAL
+            for stale in [k for k, (expires, _) in self._data.items() if expires and expires < now]:
+                del self._data[stale]
+        while len(self._data) > self.max_entries:
+            del self._data[next(iter(self._data))]
+
+    def _get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires and expires < time.time():
+            with self._lock:
+                self._data.pop(key, None)
+            return None
+        return value
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _add(self, key: str, value: Any, ttl: Optional[float]) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and not (entry[0] and entry[0] < time.time()):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _delete_prefix(self, prefix: str) -> None:
+        self._delete_prefixes([prefix])
+
+    def _delete_prefixes(self, prefixes: List[str]) -> None:
+        matches = tuple(prefixes)
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(matches)]:
+                del self._data[key]
+
+
+class DiskCache(Cache):
+    """Cache stored in a SQLite file, shared by the processes on one host."""
+
+    def __init__(self, path: str, prefix: str = "") -> None:
+        super().__init__(prefix)
+        self.path = path
+        self._local = threading.local()
+        self._next_sweep = time.time() + SWEEP_INTERVAL
+
+    def _query(self, sql: str, params: Tuple = ()) -> Optional[List[Tuple]]:
+        """Run a statement; None (a miss / no-op for callers) on a database error."""
+        try:
+            return self._conn().execute(sql, params).fetchall()
+        except sqlite3.Error:
+            return None
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires REAL, value TEXT)")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Optional[Any]:
+        rows = self._query("SELECT expires, value FROM cache WHERE key = ?", (key,))
+        if not rows:
+            return None
+        expires, value = rows[0]
+        if expires and expires < time.time():
+            self._delete(key)
+            return None
+        return json.loads(value)
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        now = time.time()
+        self._query(
+            "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+            (key, now + ttl if ttl else 0.0, json.dumps(value)),
+        )
+        if now >= self._next_sweep:
+            self._next_sweep = now + SWEEP_INTERVAL
+            self._query("DELETE FROM cache WHERE expires > 0 AND expires < ?", (now,))
+
+    def _add(self, key: str, value: Any, ttl: Optional[float]) -> bool:
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM cache WHERE key = ? AND expires > 0 AND expires < ?", (key, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                    (key, now + ttl if ttl else 0.0, json.dumps(value)),
+                )
+                return cursor.rowcount == 1
+            finally:
+                conn.execute("COMMIT")
+        except sqlite3.Error:
+            return True
+
+    def _delete(self, key: str) -> None:
+        self._query("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _delete_prefix(self, prefix: str) -> None:
+        # substr() instead of LIKE so "_" and "%" in keys are not wildcards.
+        self._query("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def _delete_prefixes(self, prefixes: List[str]) -> None:
+        # One statement per 400 prefixes keeps under SQLite's bound-parameter limit.
+        for start in range(0, len(prefixes), 400):
+            chunk = prefixes[start:start + 400]
+            where = " OR ".join(["substr(key, 1, ?) = ?"] * len(chunk))
+            params = tuple(value for prefix in chunk for value in (len(prefix), prefix))
+            self._query(f"DELETE FROM cache WHERE {where}", params)
+
+
+class RedisCache(Cache):
+    """Cache on a Redis-protocol server, with pub/sub invalidation across replicas."""
+
+    CHANNEL = "cache-invalidation"
+    # Seconds to skip the server (and to wait between listener retries) after an error.
+    RETRY_INTERVAL = 5.0
+    # Socket timeouts for clients built by from_url(), so a dead server cannot stall requests.
+    SOCKET_TIMEOUT = 2.0
+
+    def __init__(self, client: Any, prefix: str = "") -> None:
+        super().__init__(prefix)
+        self.client = client
+        self._errors = _redis_errors()
+        self._down_until = 0.0
+        self._listener = None
+        self._listener_retry_at = 0.0
+        self._listener_lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "") -> "RedisCache":
+        import redis
+
+        client = redis.Redis.from_url(url, socket_timeout=cls.SOCKET_TIMEOUT, socket_connect_timeout=cls.SOCKET_TIMEOUT)
+        return cls(client, prefix)
+
+    def _call(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a client call; None (a miss / no-op for callers) while the server is failing."""
+        if time.time() < self._down_until:
+            return None
+        try:
+            return fn(*args, **kwargs)
+        except self._errors:
+            self._down_until = time.time() + self.RETRY_INTERVAL
+            return None
+
+    def _get(self, key: str) -> Optional[Any]:
+        self._ensure_listener()
+        value = self._call(self.client.get, key)
+        return None if value is None else json.loads(value)
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        self._call(self.client.set, key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def _add(self, key: str, value: Any, ttl: Optional[float]) -> bool:
+        if time.time() < self._down_until:
+            return True
+        try:
+            return bool(self.client.set(key, json.dumps(value), px=int(ttl * 1000) if ttl else None, nx=True))
+        except self._errors:
+            self._down_until = time.time() + self.RETRY_INTERVAL
+            return True
+
+    def _delete(self, key: str) -> None:
+        self._call(self.client.delete, key)
+
+    def _delete_prefix(self, prefix: str) -> None:
+        self._delete_prefixes([prefix])
+
+    def _delete_prefixes(self, prefixes: List[str]) -> None:
+        # A single SCAN over the prefixes' common start, filtered client-side,
+        # rather than one SCAN of the whole keyspace per prefix.
+        common = os.path.commonprefix(prefixes)
+        matches = tuple(prefix.encode("utf-8") for prefix in prefixes)
+
+        def delete_matching() -> None:
+            keys = [key for key in self.client.scan_iter(match=_escape_glob(common) + "*", count=500)
+                    if (key if isinstance(key, bytes) else key.encode("utf-8")).startswith(matches)]
+            for start in range(0, len(keys), 500):
+                self.client.delete(*keys[start:start + 500])
+
+        self._call(delete_matching)
+
+    def _publish(self, namespace: str, key: Optional[str]) -> None:
+        # Local subscribers are notified when our own message comes back; if it
+        # cannot be sent, notify them directly so this process stays consistent.
+        sent = self._call(self.client.publish, self.prefix + self.CHANNEL, json.dumps([namespace, key]))
+        if sent is None or self._listener is None:
+            self._notify(namespace, key)
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        super().subscribe(callback)
+        self._ensure_listener()
+
+    def _ensure_listener(self) -> None:
+        """Start the pub/sub listener thread if there are subscribers; retried after failures."""
+        if self._listener is not None or not self._subscribers or time.time() < self._listener_retry_at:
+            return
+        with self._listener_lock:
+            if self._listener is not None:
+                return
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.prefix + self.CHANNEL: self._on_message})
+                self._listener = pubsub.run_in_thread(
+                    sleep_time=1.0, daemon=True, exception_handler=self._on_listener_error
+                )
+            except self._errors:
+                self._listener_retry_at = time.time() + self.RETRY_INTERVAL
+
+    def _on_listener_error(self, exc: Exception, pubsub: Any, thread: Any) -> None:
+        # Keep the thread alive: the next read reconnects and resubscribes.
+        time.sleep(self.RETRY_INTERVAL)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        try:
+            namespace, key = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        self._notify(namespace, key)
+
+
+def _redis_errors() -> Tuple[type, ...]:
+    try:
+        from redis.exceptions import RedisError
+    except ImportError:
+        return (OSError,)
+    return (RedisError, OSError)
+
+
+def _escape_glob(value: str) -> str:
+    for char in "\\*?[]":
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+def create_cache_from_env() -> Cache:
+    """Build the cache selected by the CACHE_* environment variables."""
+    backend = os.environ.get("CACHE_BACKEND", "memory").lower()
+    prefix = os.environ.get("CACHE_PREFIX", "")
+    if backend == "redis":
+        return RedisCache.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0"), prefix)
+    if backend == "disk":
+        path = os.environ.get("CACHE_PATH", os.path.join(tempfile.gettempdir(), "reka_cache.sqlite3"))
+        return DiskCache(path, prefix)
+    return MemoryCache(prefix, int(os.environ.get("CACHE_MAX_ENTRIES", "10000")))
@@ -0,0 +1,273 @@
+"""
+Run many Reka Research prompts concurrently and collect the streamed output.
+
+Two transports are provided and return the same `ResearchRun` objects:
+
+- `research_many_openai`: uses `AsyncOpenAI` (pip install openai)
+- `research_many_httpx`: posts to the REST endpoint with `httpx` (pip install httpx)
+
+Both stream every request and record, as chunks arrive, one row per reasoning
+step and per tool call with its offset from the start of the request, so a
+batch of runs can be turned into a table with `to_records` / `to_dataframe`.
+
+In a notebook (top-level `await` is supported by Jupyter):
+
+    runs = await research_many_openai(prompts, api_key=API_KEY, concurrency=8)
+    df = to_dataframe(runs)
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from .ratelimit import rate_limited_async_http_client
+
+BASE_URL = "https://api.reka.ai/v1"
+MODEL = "reka-flash-research"
+
+
+@dataclass
+class ResearchRun:
+    """Outcome of one research prompt.
+
+    Attributes:
+        prompt_id: Position of the prompt in the input list.
+        prompt: The prompt text.
+        answer: Concatenated `content` of the streamed response.
+        steps: One dict per reasoning step or tool call (see `to_records`).
+        first_chunk_s: Seconds until the first streamed chunk arrived.
+        elapsed_s: Seconds until the stream finished (or failed).
+        error: Error message if the request failed.
+    """
+
+    prompt_id: int
+    prompt: str
+    answer: str = ""
+    steps: List[Dict[str, Any]] = field(default_factory=list)
+    first_chunk_s: Optional[float] = None
+    elapsed_s: Optional[float] = None
+    error: Optional[str] = None
+
+
+class _StreamAggregator:
+    """Fold streamed chat.completions chunks (as dicts) into a ResearchRun."""
+
+    def __init__(self, run: ResearchRun) -> None:
+        self.run = run
+        self.start = time.perf_counter()
+        self._answer_parts: List[str] = []
+
+    def _add_step(self, kind: str, offset: float, **fields: Any) -> None:
+        self.run.steps.append({"step": len(self.run.steps), "kind": kind, "t_offset_s": offset, **fields})
+
+    def add_chunk(self, chunk: Dict[str, Any]) -> None:
+        offset = time.perf_counter() - self.start
+        if self.run.first_chunk_s is None:
+            self.run.first_chunk_s = offset
+
+        choices = chunk.get("choices") or []
+        if not choices:
+            return
+        delta = choices[0].get("delta") or {}
+
+        for step in delta.get("reasoning_steps") or []:
+            if step.get("reasoning_content"):
+                self._add_step("reasoning", offset, text=step["reasoning_content"].strip())
+            for tool_call in step.get("tool_calls") or []:
+                self._add_step(
+                    "tool_call",
+                    offset,
+                    tool_name=tool_call.get("name"),
+                    tool_args=json.dumps(tool_call.get("args", {})),
+                )
+        if not delta.get("reasoning_steps") and delta.get("reasoning_content"):
+            self._add_step("reasoning", offset, text=delta["reasoning_content"].strip())
+
+        if delta.get("content"):
+            self._answer_parts.append(delta["content"])
+
+    def finish(self, error: Optional[str] = None) -> ResearchRun:
+        self.run.answer = "".join(self._answer_parts)
+        self.run.elapsed_s = time.perf_counter() - self.start
+        self.run.error = error
+        return self.run
+
+
+async def _gather_limited(prompts: Sequence[str], concurrency: int, run_one) -> List[ResearchRun]:
+    """Run `run_one(aggregator, prompt)` for every prompt, `concurrency` at a time."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def guarded(prompt_id: int, prompt: str) -> ResearchRun:
+        async with semaphore:
+            aggregator = _StreamAggregator(ResearchRun(prompt_id=prompt_id, prompt=prompt))
+            try:
+                await run_one(aggregator, prompt)
+            except Exception as e:  # keep the other runs going
+                return aggregator.finish(error=f"{type(e).__name__}: {e}")
+            return aggregator.finish()
+
+    return await asyncio.gather(*(guarded(i, p) for i, p in enumerate(prompts)))
+
+
+async def research_many_openai(
+    prompts: Sequence[str],
+    *,
+    api_key: Optional[str] = None,
+    model: str = MODEL,
+    concurrency: int = 8,
+    base_url: str = BASE_URL,
+    **create_kwargs: Any,
+) -> List[ResearchRun]:
+    """Run research prompts concurrently with the `AsyncOpenAI` client.
+
+    Parameters:
+        prompts: User prompts, one request each.
+        api_key: Reka API key (defaults to $REKA_API_KEY).
+        model: Model name.
+        concurrency: Maximum number of requests in flight.
+        base_url: Reka API base URL.
+        **create_kwargs: Extra arguments for `chat.completions.create`
+            (e.g. `response_format`, `extra_body`).
+
+    Returns:
+        List[ResearchRun]: One run per prompt, in input order.
+    """
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(
+        base_url=base_url,
+        api_key=api_key or os.getenv("REKA_API_KEY"),
+        http_client=rate_limited_async_http_client(),
+    )
+
+    async def run_one(aggregator: _StreamAggregator, prompt: str) -> None:
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            **create_kwargs,
+        )
+        async for chunk in stream:
+            aggregator.add_chunk(chunk.model_dump())
+
+    try:
+        return await _gather_limited(prompts, concurrency, run_one)
+    finally:
+        await client.close()
+
+
+async def research_many_httpx(
+    prompts: Sequence[str],
+    *,
+    api_key: Optional[str] = None,
+    model: str = MODEL,
+    concurrency: int = 8,
+    base_url: str = BASE_URL,
+    timeout: float = 600.0,
+    **payload: Any,
+) -> List[ResearchRun]:
+    """Run research prompts concurrently against the REST endpoint with `httpx`.
+
+    Parameters:
+        prompts: User prompts, one request each.
+        api_key: Reka API key (defaults to $REKA_API_KEY).
+        model: Model name.
+        concurrency: Maximum number of requests in flight.
+        base_url: Reka API base URL.
+        timeout: Per-request timeout in seconds.
+        **payload: Extra JSON body fields (e.g. `response_format`, `research`).
+
+    Returns:
+        List[ResearchRun]: One run per prompt, in input order.
+    """
+    import httpx
+
+    headers = {
+        "Authorization": f"Bearer {api_key or os.getenv('REKA_API_KEY')}",
+        "Content-Type": "application/json",
+    }
+    limits = httpx.Limits(max_connections=max(1, concurrency))
+
+    async with rate_limited_async_http_client(base_url=base_url, headers=headers, timeout=timeout, limits=limits) as client:
+
+        async def run_one(aggregator: _StreamAggregator, prompt: str) -> None:
+            body = {
+                "model": model,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": True,
+                **payload,
+            }
+            for attempt in range(2):
+                async with client.stream("POST", "/chat/completions", json=body) as response:
+                    # A 429 was recorded by the limiter, which paused the endpoint; send
+                    # it once more, the request hook waits out the pause (or times out).
+                    if response.status_code == 429 and attempt == 0:
+                        continue
+                    response.raise_for_status()
+                    # Server-sent events: one "data: {...}" line per chunk.
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        aggregator.add_chunk(json.loads(data))
+                    return
+
+        return await _gather_limited(prompts, concurrency, run_one)
+
+
+def summary_records(runs: Sequence[ResearchRun]) -> List[Dict[str, Any]]:
+    """One row per prompt with timing columns and step counts."""
+    return [
+        {
+            "prompt_id": run.prompt_id,
+            "prompt": run.prompt,
+            "answer": run.answer,
+            "reasoning_steps": sum(1 for s in run.steps if s["kind"] == "reasoning"),
+            "tool_calls": sum(1 for s in run.steps if s["kind"] == "tool_call"),
+            "first_chunk_s": run.first_chunk_s,
+            "elapsed_s": run.elapsed_s,
+            "error": run.error,
+        }
+        for run in runs
+    ]
+
+
+def to_records(runs: Sequence[ResearchRun]) -> List[Dict[str, Any]]:
+    """One row per reasoning step or tool call across all runs.
+
+    Columns: prompt_id, prompt, step, kind ("reasoning" | "tool_call"),
+    t_offset_s, text, tool_name, tool_args, elapsed_s, error. Runs without
+    any steps (e.g. failed requests) still get one row with kind=None.
+    """
+    records = []
+    for run in runs:
+        base = {"prompt_id": run.prompt_id, "prompt": run.prompt}
+        run_cols = {"elapsed_s": run.elapsed_s, "error": run.error}
+        if not run.steps:
+            records.append({**base, "step": None, "kind": None, "t_offset_s": None,
+                            "text": None, "tool_name": None, "tool_args": None, **run_cols})
+            continue
+        for step in run.steps:
+            records.append({
+                **base,
+                "step": step["step"],
+                "kind": step["kind"],
+                "t_offset_s": step["t_offset_s"],
+                "text": step.get("text"),
+                "tool_name": step.get("tool_name"),
+                "tool_args": step.get("tool_args"),
+                **run_cols,
+            })
+    return records
+
+
+def to_dataframe(runs: Sequence[ResearchRun], summary: bool = False):
+    """Return `to_records` (or `summary_records`) as a pandas DataFrame."""
+    import pandas as pd
+
+    return pd.DataFrame(summary_records(runs) if summary else to_records(runs))
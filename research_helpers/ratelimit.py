@@ -0,0 +1,265 @@
+"""
+Client-side adaptive rate limiting for Reka API calls.
+
+A token bucket per (API key, endpoint) is stored in a small SQLite file so
+every process on the host (Gunicorn workers, Streamlit/Gradio apps,
+notebooks) draws from the same budget. The refill rate adapts AIMD-style:
+each successful response adds a little, each 429 halves it and pauses the
+bucket for the server's Retry-After (capped at REKA_RATELIMIT_MAX_RETRY_AFTER).
+Callers wait for a token rather than being rejected, but never longer than
+`max_wait`: if the wait would exceed it, `RateLimitTimeout` is raised. A
+request that still gets a 429 is retried once by `research_many_httpx()`
+and the roast app; the retry waits here for the pause the 429 caused.
+
+Also used by the roast_my_life app, whose image is built from the
+repository root so it can include this package.
+
+Environment Variables:
+    REKA_RATELIMIT_ENABLED: Set to "false" to disable limiting.
+    REKA_RATELIMIT_DB: Path of the shared SQLite file.
+    REKA_RATELIMIT_MAX_RPS: Upper bound on the refill rate (requests/second).
+    REKA_RATELIMIT_BURST: Bucket capacity.
+    REKA_RATELIMIT_MAX_WAIT: Longest a caller waits for a token, in seconds (default 30).
+    REKA_RATELIMIT_MAX_RETRY_AFTER: Longest pause honored from Retry-After (default 60).
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+ENABLED = os.environ.get("REKA_RATELIMIT_ENABLED", "true").lower() not in ("0", "false", "no")
+DB_PATH = os.environ.get("REKA_RATELIMIT_DB", os.path.join(tempfile.gettempdir(), "reka_ratelimit.sqlite3"))
+MAX_RATE = float(os.environ.get("REKA_RATELIMIT_MAX_RPS", "5"))
+BURST = float(os.environ.get("REKA_RATELIMIT_BURST", "5"))
+MAX_WAIT = float(os.environ.get("REKA_RATELIMIT_MAX_WAIT", "30"))
+MAX_RETRY_AFTER = float(os.environ.get("REKA_RATELIMIT_MAX_RETRY_AFTER", "60"))
+MIN_RATE = 0.05
+ADDITIVE_INCREASE = 0.05
+MULTIPLICATIVE_DECREASE = 0.5
+
+
+def limiter_key(api_key: Optional[str], endpoint: str) -> str:
+    """Bucket key for an API key and endpoint; the key itself is never stored."""
+    digest = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+    return f"{digest}:{endpoint}"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitTimeout(TimeoutError):
+    """No token became available within the caller's maximum wait."""
+
+    def __init__(self, key: str, wait: float) -> None:
+        super().__init__(f"Rate limited: next request slot in {wait:.1f}s")
+        self.key = key
+        self.wait = wait
+
+
+class AdaptiveRateLimiter:
+    """Token buckets shared across processes through a SQLite file."""
+
+    def __init__(self, path: str = DB_PATH, max_rate: float = MAX_RATE, burst: float = BURST,
+                 max_wait: float = MAX_WAIT, max_retry_after: float = MAX_RETRY_AFTER) -> None:
+        self.path = path
+        self.max_rate = max_rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.max_retry_after = max_retry_after
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL, rate REAL, updated REAL, blocked_until REAL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conn: sqlite3.Connection, key: str, now: float):
+        row = conn.execute(
+            "SELECT tokens, rate, updated, blocked_until FROM buckets WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return self.burst, self.max_rate, now, 0.0
+        tokens, rate, updated, blocked_until = row
+        tokens = min(self.burst, tokens + rate * max(0.0, now - updated))
+        return tokens, min(rate, self.max_rate), now, min(blocked_until, now + self.max_retry_after)
+
+    def _save(self, conn, key, tokens, rate, updated, blocked_until) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets (key, tokens, rate, updated, blocked_until) VALUES (?, ?, ?, ?, ?)",
+            (key, tokens, rate, updated, blocked_until),
+        )
+
+    def try_acquire(self, key: str) -> float:
+        """Take a token if one is available.
+
+        Returns:
+            float: 0.0 if a token was taken, otherwise seconds to wait before
+            trying again.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, rate, updated, blocked_until = self._load(conn, key, now)
+            if now < blocked_until:
+                wait = blocked_until - now
+            elif tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / rate
+            self._save(conn, key, tokens, rate, updated, blocked_until)
+        finally:
+            conn.execute("COMMIT")
+        return wait
+
+    def _next_sleep(self, key: str, deadline: float) -> float:
+        """0.0 once a token is taken; else seconds to sleep, or RateLimitTimeout past `deadline`."""
+        wait = self.try_acquire(key)
+        if wait > 0.0 and time.time() + wait > deadline:
+            raise RateLimitTimeout(key, wait)
+        return min(wait, 5.0)
+
+    def acquire(self, key: str, max_wait: Optional[float] = None) -> None:
+        """Block until a token is available for `key`.
+
+        Raises:
+            RateLimitTimeout: If that would take longer than `max_wait`
+            seconds (default: the limiter's max_wait).
+        """
+        deadline = time.time() + (self.max_wait if max_wait is None else max_wait)
+        while True:
+            sleep = self._next_sleep(key, deadline)
+            if sleep <= 0.0:
+                return
+            time.sleep(sleep)
+
+    async def acquire_async(self, key: str, max_wait: Optional[float] = None) -> None:
+        """Asyncio variant of `acquire`.
+
+        The SQLite work runs in a worker thread: it can block for up to the
+        connection's 30 s lock timeout while another process holds the file.
+        """
+        import asyncio
+
+        deadline = time.time() + (self.max_wait if max_wait is None else max_wait)
+        while True:
+            sleep = await asyncio.to_thread(self._next_sleep, key, deadline)
+            if sleep <= 0.0:
+                return
+            await asyncio.sleep(sleep)
+
+    def record(self, key: str, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Adapt the rate of `key` from a response status.
+
+        A 429 halves the rate, empties the bucket and pauses it for the
+        Retry-After delay (or one refill interval); a 2xx raises the rate
+        additively up to the maximum. Other statuses leave it unchanged.
+        """
+        if status_code != 429 and not 200 <= status_code < 300:
+            return
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, rate, updated, blocked_until = self._load(conn, key, now)
+            if status_code == 429:
+                rate = max(MIN_RATE, rate * MULTIPLICATIVE_DECREASE)
+                delay = parse_retry_after(retry_after)
+                delay = min(self.max_retry_after, delay if delay is not None else 1.0 / rate)
+                blocked_until = min(max(blocked_until, now + delay), now + self.max_retry_after)
+                tokens = 0.0
+            else:
+                rate = min(self.max_rate, rate + ADDITIVE_INCREASE)
+            self._save(conn, key, tokens, rate, updated, blocked_until)
+        finally:
+            conn.execute("COMMIT")
+
+
+_LIMITER: Optional[AdaptiveRateLimiter] = None
+
+
+def get_limiter() -> Optional[AdaptiveRateLimiter]:
+    """Process-wide limiter, or None when limiting is disabled."""
+    global _LIMITER
+    if not ENABLED:
+        return None
+    if _LIMITER is None:
+        _LIMITER = AdaptiveRateLimiter()
+    return _LIMITER
+
+
+def _request_key(request) -> str:
+    """Bucket key for an httpx request, from its auth header and URL."""
+    auth = request.headers.get("X-Api-Key") or request.headers.get("Authorization", "")
+    return limiter_key(auth.removeprefix("Bearer "), f"{request.url.host}{request.url.path}")
+
+
+def _request_max_wait(limiter: AdaptiveRateLimiter, request) -> float:
+    """Longest wait for a token: the limiter's max_wait, or less if the request's read timeout is shorter."""
+    timeout = (request.extensions.get("timeout") or {}).get("read")
+    return limiter.max_wait if timeout is None else min(limiter.max_wait, timeout)
+
+
+def rate_limited_http_client(**kwargs):
+    """An `httpx.Client` whose requests go through the shared limiter.
+
+    Pass it to the OpenAI SDK as `OpenAI(http_client=rate_limited_http_client())`.
+    """
+    import httpx
+
+    limiter = get_limiter()
+    if limiter is None:
+        return httpx.Client(**kwargs)
+
+    def on_request(request) -> None:
+        limiter.acquire(_request_key(request), _request_max_wait(limiter, request))
+
+    def on_response(response) -> None:
+        limiter.record(_request_key(response.request), response.status_code, response.headers.get("Retry-After"))
+
+    return httpx.Client(event_hooks={"request": [on_request], "response": [on_response]}, **kwargs)
+
+
+def rate_limited_async_http_client(**kwargs):
+    """An `httpx.AsyncClient` whose requests go through the shared limiter."""
+    import httpx
+
+    limiter = get_limiter()
+    if limiter is None:
+        return httpx.AsyncClient(**kwargs)
+
+    async def on_request(request) -> None:
+        await limiter.acquire_async(_request_key(request), _request_max_wait(limiter, request))
+
+    async def on_response(response) -> None:
+        import asyncio
+
+        # Off the event loop, like acquire_async(): SQLite may wait on another process's lock.
+        await asyncio.to_thread(
+            limiter.record, _request_key(response.request), response.status_code, response.headers.get("Retry-After")
+        )
+
+    return httpx.AsyncClient(event_hooks={"request": [on_request], "response": [on_response]}, **kwargs)
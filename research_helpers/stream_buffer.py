@@ -0,0 +1,113 @@
+"""
+Memory-bounded accumulation of streamed reasoning steps.
+
+Front ends re-render the whole reasoning trace after every chunk. Growing one
+string with `+=` copies the full trace each time (quadratic in its length)
+and keeps all of it for as long as the session lives. `StreamBuffer` keeps
+steps in a deque instead, with a cap on how many steps and characters stay
+in memory. Older steps are collapsed into a one-line note ("12 earlier steps
+not shown") and, when a spill directory is set, appended to a file on disk
+so the full trace can still be read back with `full_text()`.
+
+Environment Variables (see stream_buffer_from_env):
+    STREAM_BUFFER_MAX_STEPS: Steps kept in memory (default 100).
+    STREAM_BUFFER_MAX_CHARS: Characters kept in memory (default 50000).
+    STREAM_BUFFER_SPILL_DIR: Directory for spilled steps; unset = discard them.
+"""
+
+import os
+import tempfile
+from collections import deque
+from typing import Deque, Optional
+
+MAX_STEPS = int(os.environ.get("STREAM_BUFFER_MAX_STEPS", "100"))
+MAX_CHARS = int(os.environ.get("STREAM_BUFFER_MAX_CHARS", "50000"))
+SPILL_DIR = os.environ.get("STREAM_BUFFER_SPILL_DIR") or None
+
+
+class StreamBuffer:
+    """The most recent steps of a streamed trace, joined on demand.
+
+    Parameters:
+        max_steps: Most steps kept in memory.
+        max_chars: Most characters kept in memory (the newest step is always kept).
+        separator: Inserted between steps by `text()`.
+        spill_dir: If set, dropped steps are appended to a temp file in this directory.
+        collapsed_note: Shown first by `text()` once steps were dropped; `{count}` is replaced.
+    """
+
+    def __init__(
+        self,
+        max_steps: int = MAX_STEPS,
+        max_chars: int = MAX_CHARS,
+        separator: str = "\n\n",
+        spill_dir: Optional[str] = None,
+        collapsed_note: str = "_{count} earlier steps not shown_",
+    ) -> None:
+        self.max_steps = max(1, max_steps)
+        self.max_chars = max_chars
+        self.separator = separator
+        self.spill_dir = spill_dir
+        self.collapsed_note = collapsed_note
+        self.dropped = 0
+        self._steps: Deque[str] = deque()
+        self._chars = 0
+        self._text: Optional[str] = ""
+        self._spill = None
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def append(self, step: str) -> None:
+        """Add a step, collapsing the oldest ones if the buffer is over its cap."""
+        self._steps.append(step)
+        self._chars += len(step)
+        while len(self._steps) > 1 and (len(self._steps) > self.max_steps or self._chars > self.max_chars):
+            oldest = self._steps.popleft()
+            self._chars -= len(oldest)
+            self.dropped += 1
+            if self.spill_dir is not None:
+                self._spill_step(oldest)
+        self._text = None
+
+    def text(self) -> str:
+        """The visible trace: a collapsed-steps note (if any) and the kept steps."""
+        if self._text is None:
+            body = self.separator.join(self._steps)
+            if self.dropped:
+                body = self.collapsed_note.format(count=self.dropped) + self.separator + body
+            self._text = body
+        return self._text
+
+    def full_text(self) -> str:
+        """Every step, including spilled ones. Steps dropped without a spill file are lost."""
+        if self._spill is None:
+            return self.separator.join(self._steps)
+        self._spill.flush()
+        self._spill.seek(0)
+        spilled = self._spill.read()
+        return spilled + self.separator.join(self._steps)
+
+    def close(self) -> None:
+        """Delete the spill file, if any."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def __enter__(self) -> "StreamBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _spill_step(self, step: str) -> None:
+        if self._spill is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._spill = tempfile.TemporaryFile("w+", encoding="utf-8", dir=self.spill_dir, prefix="stream-")
+        self._spill.write(step + self.separator)
+
+
+def stream_buffer_from_env(**kwargs) -> StreamBuffer:
+    """A StreamBuffer using the STREAM_BUFFER_* settings; `kwargs` override them."""
+    kwargs.setdefault("spill_dir", SPILL_DIR)
+    return StreamBuffer(**kwargs)
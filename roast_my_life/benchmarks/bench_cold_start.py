@@ -0,0 +1,88 @@
+"""
+Benchmark: cold start, from launching the server to its first response.
+
+Starts the app the way it is deployed and polls `/` until it answers:
+
+- dev: `python src/app.py` (Flask debug server with the reloader)
+- nodebug: `python src/app.py` with FLASK_DEBUG=0
+- gunicorn: the Docker image's command, run on this machine
+- docker: `docker run` of a built image (pass --image)
+
+Each mode is started --runs times (default 5); the median and the slowest
+run are printed. Upstream calls are not made (BASE_URL points nowhere).
+
+To run (from the roast_my_life folder):
+    $ python benchmarks/bench_cold_start.py
+    $ docker build -f Dockerfile -t roast-my-life .. && python benchmarks/bench_cold_start.py --image roast-my-life
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8765
+TIMEOUT = 60.0
+
+
+def commands(image=None):
+    """mode -> (argv, extra environment)."""
+    modes = {
+        "dev": ([sys.executable, "src/app.py"], {"FLASK_DEBUG": "1", "PORT": str(PORT)}),
+        "nodebug": ([sys.executable, "src/app.py"], {"FLASK_DEBUG": "0", "PORT": str(PORT)}),
+        "gunicorn": (["gunicorn", "--bind", f"127.0.0.1:{PORT}", "--threads", "4", "--chdir", "src", "app:app"], {}),
+    }
+    if image:
+        modes["docker"] = (["docker", "run", "--rm", "-e", "BASE_URL=http://localhost:9",
+                            "-p", f"{PORT}:5000", image], {})
+    return modes
+
+
+def first_response(argv, env) -> float:
+    """Seconds from starting `argv` until GET / returns any HTTP response."""
+    env = dict(os.environ, BASE_URL="http://localhost:9", **env)
+    start = time.perf_counter()
+    proc = subprocess.Popen(argv, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < TIMEOUT:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{PORT}/", timeout=1).close()
+                return time.perf_counter() - start
+            except urllib.error.HTTPError:
+                return time.perf_counter() - start
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"{argv[0]} exited with status {proc.returncode}")
+                time.sleep(0.01)
+        raise RuntimeError(f"no response within {TIMEOUT:.0f} s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--image", help="also start this Docker image")
+    parser.add_argument("modes", nargs="*", help="modes to run (default: all available)")
+    args = parser.parse_args()
+
+    modes = commands(args.image)
+    print(f"{'mode':>9} {'median ms':>10} {'max ms':>8}")
+    for mode in args.modes or list(modes):
+        argv, env = modes[mode]
+        times = [first_response(argv, env) for _ in range(args.runs)]
+        print(f"{mode:>9} {median(times) * 1000:>10.0f} {max(times) * 1000:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: /form render time and bytes-on-wire for large video catalogs,
+and bytes-on-wire of /api/process roast responses.
+
+Builds synthetic catalogs of 100 / 1,000 / 10,000 videos, seeds the app's
+video cache with them and measures, through the Flask test client:
+
+- cold time: page and grid fragment rendered (and compressed) from scratch
+- warm time: the encoded page served from the per-version page cache
+- response size
+
+each for Accept-Encoding identity, gzip and brotli (when installed).
+
+Then posts to /api/process with the Vision QA upstream stubbed out
+(`requests.request` returns a canned roast, so no network is used) and
+reports the JSON body size for short, medium and long roasts and for a
+four-variant request.
+
+To run (from the roast_my_life folder):
+    $ python benchmarks/bench_form_page.py
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from statistics import median
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('BASE_URL', 'http://localhost:9')
+# The stubbed upstream answers instantly; don't let the limiter pace the requests.
+os.environ.setdefault('REKA_RATELIMIT_ENABLED', 'false')
+
+import app as roast_app  # noqa: E402
+
+CATALOG_SIZES = [100, 1_000, 10_000]
+WARM_RUNS = 20
+
+# Approximate roast lengths, in characters of markdown, returned by the stubbed upstream.
+ROAST_SIZES = {"short": 400, "medium": 2_000, "long": 8_000}
+
+# Words for the stubbed roasts. Sentences are drawn at random (fixed seed) so
+# the text compresses roughly like prose rather than like one repeated line.
+_ROAST_WORDS = (
+    "you filmed this like the camera owed money and were collecting in person lighting somewhere "
+    "between witness protection haunted basement audio every word lands with confidence of a "
+    "shopping cart one bad wheel honestly commitment is inspiring misguided but your outfit "
+    "says job interview while background screams laundry day that pause before punchline could "
+    "have been its own season streaming service wobbling tripod nervous laugh bold choice "
+    "somehow heroic chaos energy plot twist microphone kitchen sunset confetti sequel"
+).split()
+
+
+def make_catalog(size: int):
+    """Return `size` fake video records shaped like the /videos/get results."""
+    return [
+        {
+            "video_id": str(uuid.uuid4()),
+            "url": f"https://example.com/videos/{i}.mp4",
+            "metadata": {
+                "title": f"Test video #{i} - a day in my questionable life",
+                "thumbnail": f"https://example.com/thumbs/{i}.jpg",
+            },
+        }
+        for i in range(size)
+    ]
+
+
+def seed_cache(videos) -> None:
+    """Install a fresh catalog as if fetch_catalog() had just fetched it."""
+    roast_app.video_cache.set('catalog', {"results": videos, "version": uuid.uuid4().hex}, ttl=3600)
+
+
+def timed_get(client, encoding: str = 'identity'):
+    start = time.perf_counter()
+    resp = client.get('/form', headers={'Accept-Encoding': encoding})
+    return time.perf_counter() - start, len(resp.get_data())
+
+
+def make_roast(chars: int, seed: int = 0) -> str:
+    """Markdown of roughly `chars` characters, shaped like a model's roast."""
+    rng = random.Random(f"{chars}:{seed}")
+    parts, size = [], 0
+    while size < chars:
+        if len(parts) % 4 == 0:
+            part = f"## {' '.join(rng.sample(_ROAST_WORDS, 3)).title()}"
+        else:
+            sentences = (' '.join(rng.choices(_ROAST_WORDS, k=rng.randint(8, 18))).capitalize() + '.'
+                         for _ in range(rng.randint(2, 4)))
+            part = ('- ' if len(parts) % 4 == 3 else '') + ' '.join(sentences)
+        parts.append(part)
+        size += len(part) + 2
+    return "\n\n".join(parts)
+
+
+def stub_upstream(chars: int, variants: int = 0):
+    """Patch requests.request to answer every Vision QA call with a roast of ~`chars` characters.
+
+    With `variants`, the answer holds that many different numbered roasts, as
+    asked for by prompts.build_variants_prompt().
+    """
+    if variants:
+        markdown = "\n\n".join(f"=== ROAST {i} ===\n\n{make_roast(chars, i)}" for i in range(1, variants + 1))
+    else:
+        markdown = make_roast(chars)
+
+    def fake_request(method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"chat_response": markdown}).encode('utf-8')
+        response.headers['Content-Type'] = 'application/json'
+        return response
+
+    return mock.patch.object(roast_app.requests, 'request', fake_request)
+
+
+def process_bytes(client, body, encodings):
+    """Bytes of one /api/process response per Accept-Encoding; roasts are regenerated each time."""
+    sizes = []
+    for encoding in encodings:
+        resp = client.post('/api/process', json=dict(body, regenerate=True),
+                           headers={'Accept-Encoding': encoding})
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        sizes.append(len(resp.get_data()))
+    return sizes
+
+
+def bench_process(client, encodings) -> None:
+    print(f"\n{'/api/process':>20} {'roast chars':>12} " + ' '.join(f"{e + ' KB':>12}" for e in encodings))
+    tones = list(roast_app.TONES)
+    for name, chars in ROAST_SIZES.items():
+        with stub_upstream(chars):
+            sizes = process_bytes(client, {"video_id": "bench", "params": {"length": name}}, encodings)
+        print(f"{name:>20} {chars:>12} " + ' '.join(f"{s / 1024:>12.1f}" for s in sizes))
+    with stub_upstream(ROAST_SIZES["medium"], variants=len(tones)):
+        body = {"video_id": "bench", "variants": [{"tone": tone} for tone in tones]}
+        sizes = process_bytes(client, body, encodings)
+    label = f"{len(tones)} variants"
+    print(f"{label:>20} {ROAST_SIZES['medium'] * len(tones):>12} " + ' '.join(f"{s / 1024:>12.1f}" for s in sizes))
+
+
+def main() -> None:
+    client = roast_app.app.test_client()
+    encodings = ['identity', 'gzip'] + (['br'] if roast_app.brotli else [])
+
+    print(f"{'videos':>8} {'encoding':>9} {'cold ms':>9} {'warm ms':>9} {'KB':>9}")
+    for size in CATALOG_SIZES:
+        catalog = make_catalog(size)
+        for encoding in encodings:
+            seed_cache(catalog)  # new catalog version: nothing rendered yet
+            cold, size_bytes = timed_get(client, encoding)
+            warm = median(timed_get(client, encoding)[0] for _ in range(WARM_RUNS))
+            print(f"{size:>8} {encoding:>9} {cold * 1000:>9.2f} {warm * 1000:>9.2f} {size_bytes / 1024:>9.1f}")
+
+    bench_process(client, encodings)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,42 @@
+import gzip
+import hashlib
+import json
+import contextvars
 import os
-import time
-from typing import Any, Dict, List
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
+from markupsafe import Markup
 import requests
 
+from prompts import (
+    LENGTHS,
+    PROMPT_TEMPLATES,
+    TONES,
+    build_variants_prompt,
+    prompt_key,
+    render_prompt,
+    split_variants,
+)
+from tracing import create_tracer_from_env
+
+# Shared helpers (the cache and the client-side rate limiter) live in the
+# repository root; the Docker image keeps the same layout.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from research_helpers.cache import CacheNamespace, create_cache_from_env  # noqa: E402
+from research_helpers.ratelimit import RateLimitTimeout, get_limiter, limiter_key  # noqa: E402
+
+try:
+    # Optional: brotli is preferred over gzip when both sides support it.
+    import brotli
+except ImportError:
+    brotli = None
+
 app = Flask(__name__)
 
 load_dotenv()
@@ -19,31 +50,146 @@ REKA_VIDEO_QA_ENDPOINT = os.environ.get(
     f"{base_url.rstrip('/')}/qa/chat"
 )
 
-# Simple in-memory cache for videos to avoid hitting the API on every request.
-_VIDEO_CACHE: Dict[str, Any] = {
-    "timestamp": 0.0,
-    "ttl": 60.0,
-    "results": []
+# Request tracing (no-op unless TRACING_EXPORTER is set; see tracing.py).
+# Spans cover each route, upstream call, cache lookup and post-processing step.
+tracer = create_tracer_from_env()
+
+# Shared cache (in-memory, on-disk or Redis; see research_helpers/cache.py and CACHE_BACKEND).
+# With a shared backend every worker and replica reuses the same catalog and
+# roasts, and invalidations are broadcast to all of them.
+CACHE = create_cache_from_env()
+
+# Video catalog: "catalog" holds { "results", "version" } for VIDEO_CACHE_TTL
+# seconds; "fallback" keeps the last good copy for when the API is down.
+# "version" is a hash of the results, so anything derived from the catalog can
+# be cached against it on any replica.
+VIDEO_CACHE_TTL = float(os.environ.get('VIDEO_CACHE_TTL', '60'))
+video_cache = CACHE.namespace('videos', ttl=VIDEO_CACHE_TTL)
+
+# Rendered video grid HTML, reused until the catalog version changes. This is
+# per process; it is dropped when any replica invalidates the catalog.
+_GRID_FRAGMENT_CACHE: Dict[str, Any] = {
+    "version": None,
+    "html": None
+}
+
+# The whole /form page for the current catalog version, already encoded, so
+# warm page loads skip both rendering and compression:
+# (catalog version, accepted encoding) -> (body, Content-Encoding or "identity").
+# Only the latest version is kept; dropped together with the grid fragment.
+_FORM_PAGE_CACHE: Dict[Tuple[str, str], Tuple[bytes, str]] = {}
+_FORM_PAGE_CACHE_LOCK = threading.Lock()
+
+# Generated roasts, one namespace per video ("roasts:<video_id>") keyed by the
+# hash of the rendered prompt, so every prompt variant is cached separately and
+# deleting a video drops all of them. Only successful results are cached.
+ROAST_CACHE_TTL = float(os.environ.get('ROAST_CACHE_TTL', '86400'))
+
+# Upper bound on prompt variants requested in one /api/process call.
+MAX_PROMPT_VARIANTS = int(os.environ.get('MAX_PROMPT_VARIANTS', '4'))
+
+# Optional background prewarming of roasts for newly indexed videos.
+PREWARM_ENABLED = os.environ.get('PREWARM_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+PREWARM_CONCURRENCY = int(os.environ.get('PREWARM_CONCURRENCY', '1'))
+PREWARM_MAX_PER_MINUTE = int(os.environ.get('PREWARM_MAX_PER_MINUTE', '6'))
+PREWARM_POLL_INTERVAL = float(os.environ.get('PREWARM_POLL_INTERVAL', '30'))
+
+# Number of user-initiated roasts in progress; the prewarmer yields to them.
+_ACTIVE_USER_ROASTS = 0
+_ACTIVE_USER_ROASTS_LOCK = threading.Lock()
+
+# Bulk catalog operations. The upstream delete endpoint accepts a list of ids;
+# uploads are one video per upstream call and run a few at a time, at most
+# MAX_UPLOAD_BATCH per request.
+MAX_DELETE_BATCH = int(os.environ.get('MAX_DELETE_BATCH', '100'))
+MAX_UPLOAD_BATCH = int(os.environ.get('MAX_UPLOAD_BATCH', '20'))
+UPLOAD_CONCURRENCY = int(os.environ.get('UPLOAD_CONCURRENCY', '4'))
+
+# Response compression settings. Bodies smaller than the minimum size are
+# sent as-is since the encoding overhead outweighs the savings.
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '500'))
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', '6'))
+_COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
 }
 
 
-def fetch_videos() -> List[Dict[str, Any]]:
+def reka_request(method: str, url: str, **kwargs: Any) -> requests.Response:
     """
-    Fetch the list of videos from Reka Vision API, with basic caching.
+    Send a request to the Reka API through the shared client-side rate limiter.
+
+    Waits for a token for this API key and endpoint (shared with the other
+    workers and apps on this host), sends the request with `requests`, then
+    feeds the status and Retry-After header back so the rate adapts to 429s.
+    A 429 is retried once, after waiting for the pause it caused. The wait
+    for a token is bounded by the request's `timeout`, so a long Retry-After
+    pause fails fast with RateLimitTimeout (served as a 503).
+    The call is traced as a span and carries a `traceparent` header upstream.
+
+    Parameters:
+        method (str): HTTP method.
+        url (str): Full request URL.
+        **kwargs: Passed through to requests.request().
+
+    Returns:
+        requests.Response: The upstream response.
+
+    Raises:
+        RateLimitTimeout: When no request slot frees up within the timeout.
+    """
+    parts = urlsplit(url)
+    with tracer.span(f"HTTP {method}", {"http.method": method, "http.url": parts.netloc + parts.path}) as span:
+        # Propagate unsampled traces too (flag 00), so upstream keeps the trace id.
+        if tracer.enabled:
+            kwargs['headers'] = tracer.inject(dict(kwargs.get('headers') or {}))
+
+        limiter = get_limiter()
+        if limiter is None:
+            response = requests.request(method, url, **kwargs)
+        else:
+            key = limiter_key(api_key, parts.netloc + parts.path)
+            for attempt in range(2):
+                with tracer.span("ratelimit.acquire", {"attempt": attempt}):
+                    limiter.acquire(key, max_wait=kwargs.get('timeout'))
+                response = requests.request(method, url, **kwargs)
+                limiter.record(key, response.status_code, response.headers.get('Retry-After'))
+                if response.status_code != 429 or attempt:
+                    break
+                span.set_attribute("http.retried_429", True)
+
+        span.set_attribute("http.status_code", response.status_code)
+        span.set_attribute("http.response_bytes", len(response.content))
+        if not response.ok:
+            span.set_error(f"HTTP {response.status_code}")
+        return response
+
+
+def fetch_catalog() -> Dict[str, Any]:
+    """
+    Fetch the list of videos from Reka Vision API, with caching.
 
     The API is expected to respond with a JSON structure containing a
     "results" key that holds a list of video objects. Each video includes
     metadata with fields like "title" and "thumbnail".
 
     Returns:
-        List[Dict[str, Any]]: List of video dictionaries from the API.
+        Dict[str, Any]: { "results": list of video dictionaries from the API,
+        "version": hash of the results or None when there is no catalog }.
     """
-    now = time.time()
-    is_stale = (now - _VIDEO_CACHE["timestamp"]) > _VIDEO_CACHE["ttl"]
-
     if not base_url:
         # Without BASE_URL we can't call the API; return empty.
-        return []
+        return {"results": [], "version": None}
+
+    with tracer.span("cache.get", {"cache.namespace": "videos", "cache.key": "catalog"}) as span:
+        cached = video_cache.get('catalog')
+        span.set_attribute("cache.hit", cached is not None)
+    if cached is not None:
+        return cached
 
     url = f"{base_url.rstrip('/')}/videos/get"
     headers = {}
@@ -51,28 +197,36 @@ def fetch_videos() -> List[Dict[str, Any]]:
         headers["X-Api-Key"] = api_key
 
     try:
-        response = requests.post(url, headers=headers, timeout=10)
+        response = reka_request('POST', url, headers=headers, timeout=10)
         response.raise_for_status()
         data = response.json()
         results = data.get("results", [])
-        _VIDEO_CACHE.update({
-            "timestamp": now,
-            "results": results
-        })
-        return results
+        version = hashlib.sha1(json.dumps(results, sort_keys=True).encode()).hexdigest()
+        catalog = {"results": results, "version": version}
+        video_cache.set('catalog', catalog)
+        video_cache.set('fallback', catalog, ttl=0)
+        return catalog
     except Exception as e:
         # On failure, keep old cache if available; otherwise empty list.
-        if _VIDEO_CACHE["results"]:
-            return _VIDEO_CACHE["results"]
-        return []
+        return video_cache.get('fallback') or {"results": [], "version": None}
+
 
+def fetch_videos() -> List[Dict[str, Any]]:
+    """
+    Return the current list of videos (see fetch_catalog()).
 
-def call_reka_vision_qa(video_id: str) -> Dict[str, Any]:
+    Returns:
+        List[Dict[str, Any]]: List of video dictionaries from the API.
+    """
+    return fetch_catalog()["results"]
+
+
+def call_reka_vision_qa(video_id: str, prompt: Optional[str] = None) -> Dict[str, Any]:
     """Call the Reka Video QA API for a given video.
 
     The request format follows the user's provided specification. We issue a
-    POST request with the video_id and a static user prompt asking to gently
-    roast the person in the video.
+    POST request with the video_id and a user prompt, by default the gentle
+    roast prompt (see prompts.py).
 
     Environment Variables:
         REKA_VIDEO_QA_ENDPOINT: Optional override for the API endpoint.
@@ -80,6 +234,7 @@ def call_reka_vision_qa(video_id: str) -> Dict[str, Any]:
 
     Parameters:
         video_id (str): The UUID of the video to query.
+        prompt (Optional[str]): Rendered prompt text; defaults to render_prompt().
 
     Returns:
         Dict[str, Any]: Parsed JSON response (may include keys like
@@ -90,18 +245,22 @@ def call_reka_vision_qa(video_id: str) -> Dict[str, Any]:
     if api_key:
         headers['X-Api-Key'] = api_key
 
+    if prompt is None:
+        prompt, _ = render_prompt()
+
     payload = {
         "video_id": video_id,
         "messages": [
             {
                 "role": "user",
-                "content": "Write a funny and gently roast about the person, or the voice in this video. Reply in a markdown format."
+                "content": prompt
             }
         ]
     }
 
     try:
-        resp = requests.post(
+        resp = reka_request(
+            'POST',
             REKA_VIDEO_QA_ENDPOINT,
             headers=headers,
             json=payload,
@@ -117,6 +276,8 @@ def call_reka_vision_qa(video_id: str) -> Dict[str, Any]:
         if not resp.ok and 'error' not in data:
             data['error'] = f"HTTP {resp.status_code} calling chat endpoint"
         return data
+    except RateLimitTimeout:
+        raise
     except requests.Timeout:
         return {"error": "Request to chat API timed out"}
     except Exception as e:  # broad catch to avoid propagating unexpected errors
@@ -169,27 +330,131 @@ def _strip_code_fences(s: str) -> str:
     return s
 
 
-@app.route('/')
-def home() -> str:
+@app.before_request
+def _start_request_span() -> None:
+    """Open a span for the request, continuing an incoming `traceparent` if any."""
+    if not tracer.enabled:
+        return
+    route = request.url_rule.rule if request.url_rule else '<unmatched>'
+    span = tracer.span(
+        f"{request.method} {route}",
+        {"http.method": request.method, "http.route": route},
+        traceparent=request.headers.get('traceparent'),
+    )
+    g.trace_span = span.__enter__()
+
+
+@app.after_request
+def _record_response_on_span(response: Response) -> Response:
+    """Record status and size on the request span.
+
+    Registered before compress_response, so it runs after it (Flask runs
+    after_request hooks in reverse) and sees the bytes actually sent.
     """
-    Render the home page with welcome text.
+    span = g.get('trace_span')
+    if span is not None:
+        span.set_attribute("http.status_code", response.status_code)
+        if not response.is_streamed:
+            span.set_attribute("http.response_bytes", response.calculate_content_length())
+        if response.status_code >= 500:
+            span.set_error(f"HTTP {response.status_code}")
+    return response
+
+
+@app.teardown_request
+def _end_request_span(exc: Optional[BaseException]) -> None:
+    """Close the request span, recording an unhandled exception if there was one."""
+    span = g.pop('trace_span', None)
+    if span is not None:
+        span.__exit__(type(exc) if exc else None, exc, None)
+
+
+@app.errorhandler(RateLimitTimeout)
+def _rate_limited(e: RateLimitTimeout) -> Tuple[Response, int]:
+    """The shared rate limiter could not free a slot in time: ask the client to retry."""
+    response = jsonify({"success": False, "error": str(e)})
+    response.headers['Retry-After'] = str(max(1, int(e.wait + 0.5)))
+    return response, 503
+
+
+def _negotiate_encoding() -> Optional[str]:
+    """Pick the best content encoding the client accepts, if any.
 
     Returns:
-        str: Rendered HTML template for the home page.
+        Optional[str]: 'br', 'gzip' or None when no supported encoding is
+        acceptable to the client.
     """
-    return render_template('index.html')
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(supported)
 
 
-@app.route('/form')
-def form_page() -> str:
+@app.after_request
+def compress_response(response: Response) -> Response:
+    """Compress text responses (HTML, JSON, CSS...) negotiated via Accept-Encoding.
+
+    Streamed/passthrough responses, already-encoded bodies, error statuses
+    and small payloads are left untouched.
     """
-    Render the form page with dynamic video selection grid.
+    response.vary.add('Accept-Encoding')
+
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or not 200 <= response.status_code < 300
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in _COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(_compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _compress_body(body: bytes, encoding: str) -> bytes:
+    """Compress `body` with 'br' or 'gzip' at COMPRESS_LEVEL."""
+    with tracer.span("response.compress", {"encoding": encoding, "bytes_in": len(body)}) as span:
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=min(COMPRESS_LEVEL, 11))
+        else:
+            compressed = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+        span.set_attribute("bytes_out", len(compressed))
+    return compressed
+
+
+def render_video_grid(catalog: Optional[Dict[str, Any]] = None) -> Markup:
+    """Render the video grid fragment, reusing the cached HTML when possible.
+
+    The fragment is keyed on the catalog version, so it is only re-rendered
+    after fetch_catalog() observes a changed catalog.
+
+    Parameters:
+        catalog (Optional[Dict[str, Any]]): As returned by fetch_catalog();
+            fetched when omitted.
 
     Returns:
-        str: Rendered HTML template for the form page.
+        Markup: Rendered HTML for the video cards.
     """
-    videos = fetch_videos()
+    if catalog is None:
+        catalog = fetch_catalog()
+    videos, version = catalog["results"], catalog["version"]
+    if _GRID_FRAGMENT_CACHE["html"] is not None and _GRID_FRAGMENT_CACHE["version"] == version:
+        return _GRID_FRAGMENT_CACHE["html"]
+
+    with tracer.span("render.video_grid", {"videos": len(videos)}):
+        return _render_video_grid(videos, version)
+
 
+def _render_video_grid(videos: List[Dict[str, Any]], version: Optional[str]) -> Markup:
+    """Render the grid fragment from scratch and store it in the fragment cache."""
     # Transform videos to a simplified structure for the template.
     template_videos = []
     for v in videos:
@@ -202,35 +467,91 @@ def form_page() -> str:
             "url": v.get("url") or meta.get("url") or "",
         })
 
-    return render_template('form.html', videos=template_videos)
+    html = Markup(render_template('_video_grid.html', videos=template_videos))
+    _GRID_FRAGMENT_CACHE.update({
+        "version": version,
+        "html": html
+    })
+    return html
 
 
-@app.route('/api/upload_video', methods=['POST'])
-def upload_video() -> Dict[str, Any]:
+@app.route('/')
+def home() -> str:
     """
-    Upload a new video to the Reka Vision API.
-
-    Expects JSON body: { "video_name": "string", "video_url": "string" }
+    Render the home page with welcome text.
 
     Returns:
-        Dict[str, Any]: JSON response with fields:
-            success (bool)
-            video_id (str) when successful
-            error (str) when not successful
+        str: Rendered HTML template for the home page.
     """
-    data = request.get_json() or {}
-    video_name = data.get('video_name', '').strip()
-    video_url = data.get('video_url', '').strip()
+    return render_template('index.html')
 
-    if not video_name or not video_url:
-        return jsonify({"error": "Both video_name and video_url are required"}), 400
 
-    if not api_key:
-        return jsonify({"error": "API key not configured"}), 500
+@app.route('/form')
+def form_page() -> Response:
+    """
+    Render the form page with dynamic video selection grid.
+
+    The page only changes with the catalog, so it is cached per catalog
+    version and content encoding, already compressed (see _FORM_PAGE_CACHE);
+    compress_response() leaves these responses alone.
 
-    # Call Reka API to upload video
+    Returns:
+        Response: The form page, encoded for the client.
+    """
+    catalog = fetch_catalog()
+    version = catalog["version"]
+    accepted = _negotiate_encoding() or 'identity'
+
+    cached = _FORM_PAGE_CACHE.get((version, accepted))
+    if cached is not None:
+        return _form_page_response(*cached)
+
+    html = render_template(
+        'form.html',
+        video_grid=render_video_grid(catalog),
+        prompt_names=list(PROMPT_TEMPLATES),
+        tones=TONES,
+        lengths=list(LENGTHS)
+    )
+    if version is None:
+        return Response(html, mimetype='text/html')
+
+    body, encoding = html.encode('utf-8'), 'identity'
+    if accepted != 'identity' and len(body) >= COMPRESS_MIN_SIZE:
+        body, encoding = _compress_body(body, accepted), accepted
+    with _FORM_PAGE_CACHE_LOCK:
+        if any(key[0] != version for key in _FORM_PAGE_CACHE):
+            _FORM_PAGE_CACHE.clear()
+        _FORM_PAGE_CACHE[(version, accepted)] = (body, encoding)
+    return _form_page_response(body, encoding)
+
+
+def _form_page_response(body: bytes, encoding: str) -> Response:
+    """An HTML response for an already encoded /form body."""
+    response = Response(body, mimetype='text/html')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _upload_video_upstream(video_name: str, video_url: str) -> Tuple[bool, int, Dict[str, Any]]:
+    """Upload a single video to the Reka Vision API.
+
+    The upstream /videos/upload endpoint takes one video per request, so bulk
+    uploads call this once per item. The video cache is NOT invalidated here;
+    callers do that once per request.
+
+    Parameters:
+        video_name (str): Display name for the video.
+        video_url (str): Public URL of the video file.
+
+    Returns:
+        Tuple[bool, int, Dict[str, Any]]: (ok, HTTP status, payload) where
+        payload holds video_id on success or error on failure.
+    """
     try:
-        response = requests.post(
+        response = reka_request(
+            'POST',
             f"{base_url.rstrip('/')}/videos/upload",
             headers={
                 "X-Api-Key": api_key
@@ -242,7 +563,7 @@ def upload_video() -> Dict[str, Any]:
             },
             timeout=30
         )
-        
+
         # Try to parse the response
         try:
             response_data = response.json()
@@ -250,23 +571,201 @@ def upload_video() -> Dict[str, Any]:
             response_data = {}
 
         if response.ok:
-            # Invalidate cache to force refresh
-            _VIDEO_CACHE["timestamp"] = 0.0
-            
-            video_id = response_data.get('video_id', 'unknown')
-            return jsonify({
-                "success": True, 
-                "video_id": video_id,
-                "message": "Video uploaded successfully"
-            })
-        else:
-            error_msg = response_data.get('error') or response_data.get('message') or f"HTTP {response.status_code}"
-            return jsonify({"success": False, "error": f"Upload failed: {error_msg}"}), response.status_code
+            return True, response.status_code, {"video_id": response_data.get('video_id', 'unknown')}
+        error_msg = response_data.get('error') or response_data.get('message') or f"HTTP {response.status_code}"
+        return False, response.status_code, {"error": f"Upload failed: {error_msg}"}
 
+    except RateLimitTimeout as e:
+        return False, 503, {"error": f"Upload failed: {str(e)}"}
     except requests.Timeout:
-        return jsonify({"success": False, "error": "Request timed out"}), 504
+        return False, 504, {"error": "Request timed out"}
     except Exception as e:
-        return jsonify({"success": False, "error": f"Upload failed: {str(e)}"}), 500
+        return False, 500, {"error": f"Upload failed: {str(e)}"}
+
+
+def _delete_videos_upstream(video_ids: List[str]) -> Tuple[List[str], List[Dict[str, str]], int, Optional[str]]:
+    """Delete videos from the Reka Vision API in batches.
+
+    The upstream /videos/delete endpoint accepts a list of ids, so ids are
+    sent in chunks of at most MAX_DELETE_BATCH per request. The video cache
+    is NOT invalidated here; callers do that once per request.
+
+    Parameters:
+        video_ids (List[str]): Ids of the videos to delete.
+
+    Returns:
+        Tuple[List[str], List[Dict[str, str]], int, Optional[str]]: (deleted
+        ids, failures as {"video_id", "error"} dicts, HTTP status of the last
+        failed batch or 200, "message" of the last successful batch if any).
+    """
+    deleted: List[str] = []
+    failed: List[Dict[str, str]] = []
+    status = 200
+    message: Optional[str] = None
+
+    for start in range(0, len(video_ids), MAX_DELETE_BATCH):
+        batch = video_ids[start:start + MAX_DELETE_BATCH]
+        try:
+            resp = reka_request(
+                'DELETE',
+                f"{base_url.rstrip('/')}/videos/delete",
+                headers={
+                    'X-Api-Key': api_key,
+                    'Content-Type': 'application/json'
+                },
+                json={
+                    'video_ids': batch
+                },
+                timeout=30
+            )
+
+            # Try parse response json for richer errors
+            response_data: Dict[str, Any]
+            try:
+                response_data = resp.json()
+            except Exception:
+                response_data = {}
+
+            if resp.ok:
+                deleted.extend(batch)
+                message = response_data.get('message') or message
+                continue
+            status = resp.status_code
+            error_msg = response_data.get('error') or response_data.get('message') or f"HTTP {resp.status_code}"
+        except RateLimitTimeout as e:
+            status = 503
+            error_msg = str(e)
+        except requests.Timeout:
+            status = 504
+            error_msg = "Request timed out"
+        except Exception as e:
+            status = 500
+            error_msg = str(e)
+        failed.extend({"video_id": vid, "error": f"Delete failed: {error_msg}"} for vid in batch)
+
+    return deleted, failed, status, message
+
+
+def _invalidate_video_cache() -> None:
+    """Force the next fetch_catalog() call, on every replica, to refresh the catalog."""
+    video_cache.invalidate('catalog')
+
+
+def _on_cache_invalidation(namespace: str, key: Optional[str]) -> None:
+    """Drop per-process state derived from an invalidated cache entry."""
+    if namespace == 'videos':
+        _GRID_FRAGMENT_CACHE.update({"version": None, "html": None})
+        with _FORM_PAGE_CACHE_LOCK:
+            _FORM_PAGE_CACHE.clear()
+
+
+CACHE.subscribe(_on_cache_invalidation)
+
+
+@app.route('/api/upload_video', methods=['POST'])
+def upload_video() -> Dict[str, Any]:
+    """
+    Upload a new video to the Reka Vision API.
+
+    Expects JSON body: { "video_name": "string", "video_url": "string" }
+
+    Returns:
+        Dict[str, Any]: JSON response with fields:
+            success (bool)
+            video_id (str) when successful
+            error (str) when not successful
+    """
+    data = request.get_json() or {}
+    video_name = data.get('video_name') or ''
+    video_url = data.get('video_url') or ''
+
+    if not isinstance(video_name, str) or not isinstance(video_url, str):
+        return jsonify({"error": "video_name and video_url must be strings"}), 400
+    video_name, video_url = video_name.strip(), video_url.strip()
+    if not video_name or not video_url:
+        return jsonify({"error": "Both video_name and video_url are required"}), 400
+
+    if not api_key:
+        return jsonify({"error": "API key not configured"}), 500
+
+    ok, status, payload = _upload_video_upstream(video_name, video_url)
+    if not ok:
+        return jsonify({"success": False, "error": payload["error"]}), status
+
+    # Invalidate cache to force refresh
+    _invalidate_video_cache()
+    return jsonify({
+        "success": True,
+        "video_id": payload["video_id"],
+        "message": "Video uploaded successfully"
+    })
+
+
+@app.route('/api/upload_videos', methods=['POST'])
+def upload_videos() -> Dict[str, Any]:
+    """
+    Upload several videos to the Reka Vision API in one request.
+
+    At most MAX_UPLOAD_BATCH videos are accepted per request. Uploads run
+    concurrently (up to UPLOAD_CONCURRENCY at a time) and the video cache is
+    invalidated once for the whole batch.
+
+    Expects JSON body:
+        { "videos": [ { "video_name": "string", "video_url": "string" }, ... ] }
+
+    Returns:
+        Dict[str, Any]: JSON response with fields:
+            success (bool) true when every upload succeeded
+            uploaded (list) of { video_name, video_id }
+            failed (list) of { video_name, error }
+            error (str) when the request itself is invalid
+    """
+    data = request.get_json() or {}
+    videos = data.get('videos')
+
+    if not isinstance(videos, list) or not videos:
+        return jsonify({"success": False, "error": "Missing required field: videos"}), 400
+    if len(videos) > MAX_UPLOAD_BATCH:
+        return jsonify({"success": False, "error": f"At most {MAX_UPLOAD_BATCH} videos per request"}), 400
+
+    items = []
+    for v in videos:
+        if not isinstance(v, dict):
+            return jsonify({"success": False, "error": "Each video must be an object"}), 400
+        video_name = v.get('video_name') or ''
+        video_url = v.get('video_url') or ''
+        if not isinstance(video_name, str) or not isinstance(video_url, str):
+            return jsonify({"success": False, "error": "video_name and video_url must be strings"}), 400
+        video_name, video_url = video_name.strip(), video_url.strip()
+        if not video_name or not video_url:
+            return jsonify({"success": False, "error": "Both video_name and video_url are required for every video"}), 400
+        items.append((video_name, video_url))
+
+    if not api_key:
+        return jsonify({"success": False, "error": "API key not configured"}), 500
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Run each upload in a copy of this request's context so its upstream
+    # span is parented to the route span.
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as pool:
+        outcomes = list(pool.map(lambda item: context.copy().run(_upload_video_upstream, *item), items))
+
+    uploaded, failed = [], []
+    for (video_name, _), (ok, _, payload) in zip(items, outcomes):
+        if ok:
+            uploaded.append({"video_name": video_name, "video_id": payload["video_id"]})
+        else:
+            failed.append({"video_name": video_name, "error": payload["error"]})
+
+    if uploaded:
+        _invalidate_video_cache()
+    return jsonify({
+        "success": not failed,
+        "uploaded": uploaded,
+        "failed": failed
+    })
 
 
 @app.route('/api/delete_video', methods=['POST'])
@@ -294,41 +793,232 @@ def delete_video() -> Dict[str, Any]:
     if not base_url:
         return jsonify({"success": False, "error": "BASE_URL not configured"}), 500
 
-    try:
-        resp = requests.delete(
-            f"{base_url.rstrip('/')}/videos/delete",
-            headers={
-                'X-Api-Key': api_key,
-                'Content-Type': 'application/json'
-            },
-            json={
-                'video_ids': [video_id]
-            },
-            timeout=30
-        )
+    deleted, failed, status, message = _delete_videos_upstream([video_id])
+    if failed:
+        return jsonify({"success": False, "error": failed[0]["error"]}), status
 
-        # Try parse response json for richer errors
-        response_data: Dict[str, Any]
-        try:
-            response_data = resp.json()
-        except Exception:
-            response_data = {}
+    # Invalidate cache to force refresh on next load
+    _invalidate_video_cache()
+    _drop_roasts([video_id])
+    return jsonify({
+        "success": True,
+        "message": message or "Video deleted successfully"
+    })
 
-        if resp.ok:
-            # Invalidate cache to force refresh on next load
-            _VIDEO_CACHE["timestamp"] = 0.0
-            return jsonify({
-                "success": True,
-                "message": response_data.get('message') or "Video deleted successfully"
-            })
-        else:
-            error_msg = response_data.get('error') or response_data.get('message') or f"HTTP {resp.status_code}"
-            return jsonify({"success": False, "error": f"Delete failed: {error_msg}"}), resp.status_code
 
-    except requests.Timeout:
-        return jsonify({"success": False, "error": "Request timed out"}), 504
-    except Exception as e:
-        return jsonify({"success": False, "error": f"Delete failed: {str(e)}"}), 500
+@app.route('/api/delete_videos', methods=['POST'])
+def delete_videos() -> Dict[str, Any]:
+    """
+    Delete several videos from the Reka Vision API in one request.
+
+    Ids are de-duplicated and sent upstream in batches of MAX_DELETE_BATCH;
+    the video cache is invalidated once for the whole request.
+
+    Expects JSON body: { "video_ids": ["uuid", ...] }
+
+    Returns:
+        Dict[str, Any]: JSON response with fields:
+            success (bool) true when every video was deleted
+            deleted (list) of deleted video ids
+            failed (list) of { video_id, error }
+            error (str) when the request itself is invalid
+    """
+    data = request.get_json() or {}
+    raw_ids = data.get('video_ids')
+
+    if not isinstance(raw_ids, list):
+        return jsonify({"success": False, "error": "Missing required field: video_ids"}), 400
+
+    # Keep the caller's order while dropping blanks and duplicates.
+    video_ids = list(dict.fromkeys(str(v).strip() for v in raw_ids if v and str(v).strip()))
+    if not video_ids:
+        return jsonify({"success": False, "error": "Missing required field: video_ids"}), 400
+
+    if not api_key:
+        return jsonify({"success": False, "error": "API key not configured"}), 500
+
+    if not base_url:
+        return jsonify({"success": False, "error": "BASE_URL not configured"}), 500
+
+    deleted, failed, _, _ = _delete_videos_upstream(video_ids)
+    if deleted:
+        _invalidate_video_cache()
+        _drop_roasts(deleted)
+    return jsonify({
+        "success": not failed,
+        "deleted": deleted,
+        "failed": failed
+    })
+
+
+def roast_cache_for(video_id: str) -> CacheNamespace:
+    """The roast cache namespace of one video; clear() drops every prompt variant."""
+    return CACHE.namespace(f'roasts:{video_id}', ttl=ROAST_CACHE_TTL)
+
+
+def _drop_roasts(video_ids: List[str]) -> None:
+    """Delete the cached roasts of deleted videos in one pass.
+
+    Nothing per-process is derived from roasts, so no invalidation is
+    broadcast (one publish per video would be wasted on bulk deletes).
+    """
+    CACHE.clear_namespaces(roast_cache_for(video_id).name for video_id in video_ids)
+
+
+def get_cached_roast(video_id: str, prompt: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Return the cached roast for a video and rendered prompt (default prompt if None)."""
+    if prompt is None:
+        prompt, _ = render_prompt()
+    key = prompt_key(prompt)
+    with tracer.span("cache.get", {"cache.namespace": "roasts", "cache.key": f"{video_id}:{key}"}) as span:
+        cached = roast_cache_for(video_id).get(key)
+        span.set_attribute("cache.hit", cached is not None)
+        return cached
+
+
+def _chat_response_markdown(api_data: Dict[str, Any]) -> Tuple[Optional[str], str]:
+    """
+    Pick the markdown answer out of a Vision QA response.
+
+    The primary output is the `chat_response` returned by the external API.
+    If `chat_response` is null we fall back to `system_message`, then `error`.
+
+    Returns:
+        Tuple[Optional[str], str]: (markdown, "") on success or (None, error).
+    """
+    chat_response = api_data.get('chat_response')
+    if chat_response:
+        # The model is asked for markdown, but may sometimes return structured JSON.
+        if isinstance(chat_response, str):
+            return _extract_roast_markdown(chat_response), ""
+        return chat_response, ""
+
+    # No chat_response; decide best fallback.
+    fallback = api_data.get('system_message') or api_data.get('error')
+    if not fallback:
+        fallback = "Unknown error: chat_response missing."
+    return None, fallback
+
+
+def _roast_result(video_id: str, prompt: str, markdown: str) -> Dict[str, Any]:
+    """Render a roast to HTML and cache it under its video and prompt."""
+    # Convert Markdown roast text to HTML for display
+    with tracer.span("roast.render_markdown", {"chars": len(markdown)}):
+        html_result = simple_markdown_to_html(markdown)
+    result = {"success": True, "result": html_result}
+    roast_cache_for(video_id).set(prompt_key(prompt), result)
+    return result
+
+
+def generate_roast(video_id: str, prompt_name: Optional[str] = None,
+                   params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Ask the Vision QA API to roast a video and render the answer as HTML.
+
+    Successful results are stored in the roast cache under the rendered prompt.
+
+    Parameters:
+        video_id (str): The UUID of the video to roast.
+        prompt_name (Optional[str]): Prompt template (see prompts.py).
+        params (Optional[Dict[str, str]]): Template parameters (tone, length, language).
+
+    Returns:
+        Dict[str, Any]: { "success": True, "result": html } or
+        { "success": False, "error": message }.
+
+    Raises:
+        ValueError: On an unknown prompt or parameter.
+    """
+    prompt, _ = render_prompt(prompt_name, params)
+    markdown, error = _chat_response_markdown(call_reka_vision_qa(video_id, prompt))
+    if markdown is None:
+        return {"success": False, "error": error}
+    return _roast_result(video_id, prompt, markdown)
+
+
+def generate_roast_variants(video_id: str, prompt_name: Optional[str],
+                            params_list: List[Dict[str, str]], regenerate: bool = False) -> List[Dict[str, Any]]:
+    """
+    Roast a video once per parameter set, sharing a single upstream call.
+
+    Cached variants are served from the roast cache. The rest are combined
+    into one Vision QA request (see prompts.build_variants_prompt), so the
+    video is analyzed once, and the answer is split back into variants. Each
+    variant is cached under its own prompt, so later single requests for the
+    same parameters are cache hits.
+
+    Parameters:
+        video_id (str): The UUID of the video to roast.
+        prompt_name (Optional[str]): Prompt template (see prompts.py).
+        params_list (List[Dict[str, str]]): One parameter set per variant.
+        regenerate (bool): Ignore cached variants and generate all of them.
+
+    Returns:
+        List[Dict[str, Any]]: One result per variant, in order, as returned by
+        generate_roast() plus the normalized "params".
+
+    Raises:
+        ValueError: On an unknown prompt or parameter.
+    """
+    rendered = [render_prompt(prompt_name, params) for params in params_list]
+    results: List[Optional[Dict[str, Any]]] = [
+        None if regenerate else get_cached_roast(video_id, prompt) for prompt, _ in rendered
+    ]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if len(missing) == 1:
+        results[missing[0]] = generate_roast(video_id, prompt_name, params_list[missing[0]])
+    elif missing:
+        combined = build_variants_prompt([rendered[i][0] for i in missing])
+        markdown, error = _chat_response_markdown(call_reka_vision_qa(video_id, combined))
+        with tracer.span("roast.split_variants", {"variants": len(missing)}):
+            parts = split_variants(markdown, len(missing)) if markdown else [None] * len(missing)
+        for i, part in zip(missing, parts):
+            if part is None:
+                results[i] = {"success": False, "error": error or "Variant missing from the model's answer"}
+            else:
+                results[i] = _roast_result(video_id, rendered[i][0], part)
+
+    return [dict(result, params=params) for result, (_, params) in zip(results, rendered)]
+
+
+def _extract_roast_markdown(chat_response: str) -> str:
+    """Return the markdown inside a JSON-wrapped chat_response, or the text itself.
+
+    The model is asked for markdown but sometimes answers with JSON holding
+    `sections` or a single text field; anything that is not JSON is returned
+    unchanged (the expected happy path).
+    """
+    roast_content = chat_response
+    with tracer.span("roast.extract_json") as span:
+        try:
+            cleaned_chat = _strip_code_fences(chat_response)
+            parsed = json.loads(cleaned_chat)
+            if isinstance(parsed, dict):
+                content_parts = []
+                if 'sections' in parsed:
+                    for section in parsed.get('sections', []):
+                        if not isinstance(section, dict):
+                            continue
+                        section_type = section.get('section_type', '')
+                        if section_type == 'markdown' and 'markdown' in section:
+                            content_parts.append(section['markdown'])
+                        elif 'section_content' in section:
+                            content_parts.append(section['section_content'])
+                if not content_parts:
+                    # No sections structure — look for common text fields
+                    for key in ('text', 'content', 'response', 'output', 'message', 'roast'):
+                        val = parsed.get(key)
+                        if isinstance(val, str) and val.strip():
+                            content_parts.append(val)
+                            break
+                if content_parts:
+                    roast_content = '\n\n'.join(content_parts)
+        except (json.JSONDecodeError, ValueError):
+            # Not JSON — use the raw string as markdown (expected happy path)
+            pass
+        span.set_attribute("json", roast_content is not chat_response)
+    return roast_content
 
 
 @app.route('/api/process', methods=['POST'])
@@ -336,77 +1026,118 @@ def process_video() -> Dict[str, Any]:
     """
     Process the selected video by calling the external Reka chat API.
 
-    We still optionally build a local metadata summary (kept for potential
-    future UI use), but the primary output shown to the user is the
-    `chat_response` returned by the external API. If `chat_response` is null
-    we fall back to `system_message`, then `error`.
+    Roasts already generated (by an earlier click or by the prewarmer) are
+    served from the roast cache; otherwise see generate_roast(). With
+    "regenerate" the cache is skipped and a fresh roast replaces the cached
+    one (the UI sends it when the same roast is requested again). With
+    "variants", several roasts are produced by one upstream call (see
+    generate_roast_variants()).
 
-    Expects JSON body: { "video_id": "uuid" }
+    Expects JSON body:
+        { "video_id": "uuid",
+          "prompt": "roast",                                  (optional)
+          "params": { "tone", "length", "language" },         (optional)
+          "variants": [ { "tone", "length", "language" }, ... ] (optional),
+          "regenerate": true                                  (optional) }
 
     Returns:
         Dict[str, Any]: JSON response with fields:
             success (bool)
             result (str) when success
+            results (list) of { success, result | error, params } with "variants"
             error (str) when not successful
     """
     data = request.get_json() or {}
     video_id = data.get('video_id')
+    prompt_name = data.get('prompt')
+    params = data.get('params')
+    variants = data.get('variants')
+    regenerate = bool(data.get('regenerate'))
 
     if not video_id:
         return jsonify({"error": "No video ID provided"}), 400
 
-    api_data = call_reka_vision_qa(video_id)
+    if variants is not None and (not isinstance(variants, list) or not variants):
+        return jsonify({"success": False, "error": "variants must be a non-empty list"}), 400
+    if variants is not None and len(variants) > MAX_PROMPT_VARIANTS:
+        return jsonify({"success": False, "error": f"At most {MAX_PROMPT_VARIANTS} variants per request"}), 400
 
-    # Determine final message to surface.
-    chat_response = api_data.get('chat_response')
-    system_msg = api_data.get('system_message')
-    api_error = api_data.get('error')
+    try:
+        prompt, _ = render_prompt(prompt_name, params)
+        if variants is not None:
+            for variant in variants:
+                render_prompt(prompt_name, variant)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    if variants is None and not regenerate:
+        cached = get_cached_roast(video_id, prompt)
+        if cached is not None:
+            return jsonify(cached)
+
+    global _ACTIVE_USER_ROASTS
+    with _ACTIVE_USER_ROASTS_LOCK:
+        _ACTIVE_USER_ROASTS += 1
+    try:
+        if variants is None:
+            return jsonify(generate_roast(video_id, prompt_name, params))
+        results = generate_roast_variants(video_id, prompt_name, variants, regenerate)
+        response = {"success": any(r["success"] for r in results), "results": results}
+        if not response["success"]:
+            response["error"] = results[0]["error"]
+        return jsonify(response)
+    finally:
+        with _ACTIVE_USER_ROASTS_LOCK:
+            _ACTIVE_USER_ROASTS -= 1
 
-    if chat_response:
-        roast_content = chat_response
 
-        # If chat_response is JSON, extract the markdown text from it.
-        # The model is asked for markdown, but may sometimes return structured JSON.
-        if isinstance(chat_response, str):
-            try:
-                import json
-                cleaned_chat = _strip_code_fences(chat_response)
-                parsed = json.loads(cleaned_chat)
-                if isinstance(parsed, dict):
-                    content_parts = []
-                    if 'sections' in parsed:
-                        for section in parsed.get('sections', []):
-                            if not isinstance(section, dict):
-                                continue
-                            section_type = section.get('section_type', '')
-                            if section_type == 'markdown' and 'markdown' in section:
-                                content_parts.append(section['markdown'])
-                            elif 'section_content' in section:
-                                content_parts.append(section['section_content'])
-                    if not content_parts:
-                        # No sections structure — look for common text fields
-                        for key in ('text', 'content', 'response', 'output', 'message', 'roast'):
-                            val = parsed.get(key)
-                            if isinstance(val, str) and val.strip():
-                                content_parts.append(val)
-                                break
-                    if content_parts:
-                        roast_content = '\n\n'.join(content_parts)
-            except (json.JSONDecodeError, ValueError):
-                # Not JSON — use the raw string as markdown (expected happy path)
-                pass
-
-        # Convert Markdown roast text to HTML for display
-        html_result = simple_markdown_to_html(roast_content)
-        return jsonify({"success": True, "result": html_result})
+# Claims on videos being prewarmed, shared through the cache so that several
+# worker processes do not roast the same video. A claim outlives a failed
+# attempt for as long as the prewarmer waits before retrying.
+_prewarm_claims = CACHE.namespace('prewarm-claims', ttl=300)
 
-    # No chat_response; decide best fallback.
-    fallback = system_msg or api_error
-    if not fallback:
-        fallback = "Unknown error: chat_response missing."
-    return jsonify({"success": False, "error": fallback})
 
+def _prewarm_roast(video_id: str) -> bool:
+    """Prewarmer hook: generate and cache a roast, reporting success."""
+    with tracer.span("prewarm.roast", {"video_id": video_id}):
+        return generate_roast(video_id)["success"]
+
+
+_PREWARMER = None
+
+
+@app.before_request
+def _start_prewarmer() -> None:
+    """Start prewarming on the first request served by this process.
+
+    Starting here rather than at import keeps the debug reloader's parent
+    process (which never serves requests) from prewarming too, and keeps the
+    prewarm machinery out of startup when it is disabled.
+    """
+    global _PREWARMER
+    if not PREWARM_ENABLED or _PREWARMER is not None:
+        return
+
+    from prewarm import RoastPrewarmer
+
+    _PREWARMER = RoastPrewarmer(
+        fetch_videos=fetch_videos,
+        is_cached=lambda video_id: get_cached_roast(video_id) is not None,
+        generate=_prewarm_roast,
+        claim=lambda video_id: _prewarm_claims.add(video_id, os.getpid()),
+        is_busy=lambda: _ACTIVE_USER_ROASTS > 0,
+        concurrency=PREWARM_CONCURRENCY,
+        max_per_minute=PREWARM_MAX_PER_MINUTE,
+        poll_interval=PREWARM_POLL_INTERVAL,
+    )
+    _PREWARMER.start()
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=8111)
+    # Development server. Debug mode (and its reloader, which imports the app
+    # twice) is on unless FLASK_DEBUG=0; the Docker image runs gunicorn instead.
+    app.run(
+        debug=os.environ.get('FLASK_DEBUG', '1').lower() in ('1', 'true', 'yes'),
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', '8111')),
+    )
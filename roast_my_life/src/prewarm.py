@@ -0,0 +1,155 @@
+"""
+Background prewarming of roasts for newly indexed videos.
+
+A single scheduler thread polls the video catalog and hands videos that are
+indexed but have no cached roast to a small worker pool. Work is throttled to
+`max_per_minute` upstream calls and paused while user requests are in flight,
+so prewarming only uses spare capacity.
+
+The rate limit is per process. With several worker processes, pass a `claim`
+backed by a shared cache so each video is prewarmed by one of them only.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Indexing states reported by the catalog that mean the video can be queried.
+# Videos with no status at all are treated as ready.
+_READY_STATUSES = {'indexed', 'completed', 'complete', 'ready', 'done', 'success'}
+
+
+def is_indexed(video: Dict[str, Any]) -> bool:
+    """Return True if a catalog entry looks ready for Vision QA."""
+    status = video.get('indexing_status') or video.get('status')
+    return status is None or str(status).lower() in _READY_STATUSES
+
+
+class RoastPrewarmer:
+    """Poll the catalog and generate roasts ahead of the first click.
+
+    Parameters:
+        fetch_videos: Returns the current catalog (cached is fine).
+        is_cached: Returns True when a roast for the video id is already cached.
+        generate: Generates and caches a roast for a video id; returns True on
+            success. Failures are retried after `retry_after` seconds.
+        is_busy: Returns True while user requests are in flight; prewarming
+            waits until it returns False.
+        claim: Returns False if another process is already prewarming the
+            video id; such videos are skipped until the next poll.
+        concurrency: Number of roasts generated at the same time.
+        max_per_minute: Upper bound on roasts started per minute.
+        poll_interval: Seconds between catalog polls.
+        retry_after: Seconds to wait before retrying a failed video.
+    """
+
+    def __init__(
+        self,
+        fetch_videos: Callable[[], List[Dict[str, Any]]],
+        is_cached: Callable[[str], bool],
+        generate: Callable[[str], bool],
+        is_busy: Callable[[], bool] = lambda: False,
+        claim: Callable[[str], bool] = lambda video_id: True,
+        concurrency: int = 1,
+        max_per_minute: int = 6,
+        poll_interval: float = 30.0,
+        retry_after: float = 300.0,
+    ) -> None:
+        self._fetch_videos = fetch_videos
+        self._is_cached = is_cached
+        self._generate = generate
+        self._is_busy = is_busy
+        self._claim = claim
+        self._concurrency = max(1, concurrency)
+        self._max_per_minute = max(1, max_per_minute)
+        self._poll_interval = poll_interval
+        self._retry_after = retry_after
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._in_flight: set = set()
+        self._failed_at: Dict[str, float] = {}
+        self._started_at: Deque[float] = deque()
+
+    def start(self) -> None:
+        """Start the scheduler thread (no-op if already running)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='roast-prewarm', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Ask the scheduler to stop after the current poll."""
+        self._stop.set()
+
+    def _pending(self) -> List[str]:
+        """Ids of indexed videos that still need a roast."""
+        now = time.time()
+        pending = []
+        for video in self._fetch_videos():
+            video_id = video.get('video_id')
+            if not video_id or not is_indexed(video):
+                continue
+            if video_id in self._in_flight or self._is_cached(video_id):
+                continue
+            if now - self._failed_at.get(video_id, 0.0) < self._retry_after:
+                continue
+            pending.append(video_id)
+        return pending
+
+    def _wait_for_slot(self) -> bool:
+        """Block until the rate limit and user traffic allow another roast.
+
+        Returns False if the prewarmer was stopped while waiting.
+        """
+        while not self._stop.is_set():
+            now = time.time()
+            while self._started_at and now - self._started_at[0] >= 60.0:
+                self._started_at.popleft()
+            if len(self._started_at) < self._max_per_minute and not self._is_busy():
+                self._started_at.append(now)
+                return True
+            wait = 60.0 - (now - self._started_at[0]) if len(self._started_at) >= self._max_per_minute else 0.5
+            self._stop.wait(max(0.1, wait))
+        return False
+
+    def _warm(self, video_id: str) -> None:
+        try:
+            ok = self._generate(video_id)
+        except Exception:
+            ok = False
+        with self._lock:
+            self._in_flight.discard(video_id)
+            if ok:
+                self._failed_at.pop(video_id, None)
+            else:
+                self._failed_at[video_id] = time.time()
+
+    def _run(self) -> None:
+        with ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix='roast-prewarm') as pool:
+            while not self._stop.is_set():
+                try:
+                    pending = self._pending()
+                except Exception:
+                    pending = []
+                for video_id in pending:
+                    # Keep at most `concurrency` roasts queued at once.
+                    while len(self._in_flight) >= self._concurrency and not self._stop.is_set():
+                        self._stop.wait(0.5)
+                    try:
+                        claimed = self._claim(video_id)
+                    except Exception:
+                        claimed = True
+                    if not claimed:
+                        continue
+                    if not self._wait_for_slot():
+                        return
+                    with self._lock:
+                        self._in_flight.add(video_id)
+                    pool.submit(self._warm, video_id)
+                self._stop.wait(self._poll_interval)
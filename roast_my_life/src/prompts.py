@@ -0,0 +1,128 @@
+"""
+Prompt templates for the Vision QA roast request.
+
+Each template is rendered from a small set of parameters (tone, length,
+language). Parameters are validated against the template's allowed values,
+so a request can only produce prompts we know about, and the rendered text
+is hashed into a cache key: two requests that render the same prompt share
+one cached roast.
+
+Several parameter sets can also be combined into one upstream request
+(`build_variants_prompt`). The model answers each one under a numbered
+marker and `split_variants` cuts the answer apart again, so the video is
+analyzed once for all variants.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+TONES = ("gentle", "savage", "wholesome", "sarcastic")
+
+LENGTHS = {
+    "short": " Keep it to two or three sentences.",
+    "medium": "",
+    "long": " Make it several paragraphs long.",
+}
+
+# Free-text languages are limited to (Unicode) letters, spaces and hyphens.
+_LANGUAGE = re.compile(r"^[^\W\d_](?:[^\W\d_]|[ -]){0,29}\Z")
+
+DEFAULT_PARAMS = {"tone": "gentle", "length": "medium", "language": "English"}
+
+# name -> template; placeholders are filled by render_prompt().
+PROMPT_TEMPLATES: Dict[str, str] = {
+    "roast": (
+        "Write a funny and {tone} roast about the person, or the voice in this video."
+        "{length}{language} Reply in a markdown format."
+    ),
+    "stand-up": (
+        "Write a {tone} stand-up comedy bit about what happens in this video, "
+        "as if performed on stage.{length}{language} Reply in a markdown format."
+    ),
+}
+
+DEFAULT_PROMPT = "roast"
+
+_VARIANT_MARKER = re.compile(r"^[ \t]*=+[ \t]*ROAST[ \t]+(\d+)[ \t]*=+[ \t]*$", re.MULTILINE | re.IGNORECASE)
+
+
+def normalize_params(params: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Fill defaults and validate prompt parameters.
+
+    Parameters:
+        params (Optional[Dict[str, str]]): Any of "tone", "length", "language".
+
+    Returns:
+        Dict[str, str]: All three parameters, lower-cased where enumerated.
+
+    Raises:
+        ValueError: On an unknown parameter or value.
+    """
+    params = params or {}
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object")
+    unknown = set(params) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown prompt parameter: {sorted(unknown)[0]}")
+
+    tone = str(params.get("tone") or DEFAULT_PARAMS["tone"]).strip().lower()
+    length = str(params.get("length") or DEFAULT_PARAMS["length"]).strip().lower()
+    language = str(params.get("language") or DEFAULT_PARAMS["language"]).strip()
+    if tone not in TONES:
+        raise ValueError(f"Unknown tone: {tone}")
+    if length not in LENGTHS:
+        raise ValueError(f"Unknown length: {length}")
+    if not _LANGUAGE.match(language):
+        raise ValueError(f"Unsupported language: {language}")
+    return {"tone": tone, "length": length, "language": language.title()}
+
+
+def render_prompt(name: Optional[str] = None, params: Optional[Dict[str, str]] = None) -> Tuple[str, Dict[str, str]]:
+    """Render a registered template with validated parameters.
+
+    Parameters:
+        name (Optional[str]): Template name (default DEFAULT_PROMPT).
+        params (Optional[Dict[str, str]]): See normalize_params().
+
+    Returns:
+        Tuple[str, Dict[str, str]]: (prompt text, normalized parameters).
+
+    Raises:
+        ValueError: On an unknown template, parameter or value.
+    """
+    name = name or DEFAULT_PROMPT
+    template = PROMPT_TEMPLATES.get(name)
+    if template is None:
+        raise ValueError(f"Unknown prompt: {name}")
+    params = normalize_params(params)
+    language = "" if params["language"] == "English" else f" Write it in {params['language']}."
+    text = template.format(tone=params["tone"], length=LENGTHS[params["length"]], language=language)
+    return text, params
+
+
+def prompt_key(text: str) -> str:
+    """Short stable hash of a rendered prompt, used in roast cache keys."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def build_variants_prompt(prompts: List[str]) -> str:
+    """Combine several rendered prompts into one request with numbered answers."""
+    requests = "\n\n".join(f"Request {i}: {text}" for i, text in enumerate(prompts, 1))
+    return (
+        f"Answer each of the following {len(prompts)} requests about this video separately. "
+        f"Start each answer with a line containing only \"=== ROAST <n> ===\", where <n> is the "
+        f"request number, and write nothing outside the answers.\n\n{requests}"
+    )
+
+
+def split_variants(text: str, count: int) -> List[Optional[str]]:
+    """Split a combined answer into `count` parts; missing or empty parts are None."""
+    parts: List[Optional[str]] = [None] * count
+    markers = list(_VARIANT_MARKER.finditer(text))
+    for marker, following in zip(markers, markers[1:] + [None]):
+        index = int(marker.group(1)) - 1
+        body = text[marker.end():following.start() if following else len(text)].strip()
+        if 0 <= index < count and body and parts[index] is None:
+            parts[index] = body
+    return parts
@@ -0,0 +1,177 @@
+"""
+Lightweight OpenTelemetry-style tracing for the roast app.
+
+Spans carry W3C trace context (`traceparent`), nest through a context
+variable, and are written by an exporter when they end:
+
+- "none" (default): tracing is a no-op; span() returns a shared dummy span.
+- "console": one JSON line per span on stderr.
+- "file": one JSON line per span appended to TRACING_FILE.
+
+Sampling is decided once per trace, at the root span (head sampling): a
+trace is kept with probability TRACING_SAMPLE_RATIO, or follows the sampled
+flag of an incoming `traceparent` header. Unsampled traces still propagate
+their ids upstream but record nothing.
+
+Environment Variables:
+    TRACING_EXPORTER: "none", "console" or "file".
+    TRACING_FILE: Output path for the file exporter (default traces.jsonl).
+    TRACING_SAMPLE_RATIO: Fraction of traces to record, 0.0-1.0 (default 1.0).
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, TextIO
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """A timed operation within a trace. Use as a context manager."""
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "sampled",
+                 "attributes", "status", "start", "end", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str],
+                 sampled: bool, attributes: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.status = "ok"
+        self.start = 0.0
+        self.end = 0.0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = "error"
+        self.attributes["error.message"] = message
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def __enter__(self) -> "Span":
+        self.start = time.time()
+        self._token = _CURRENT_SPAN.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end = time.time()
+        if exc is not None:
+            self.set_error(f"{exc_type.__name__}: {exc}")
+        _CURRENT_SPAN.reset(self._token)
+        if self.sampled:
+            self.tracer.export(self)
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is disabled; every method does nothing."""
+
+    sampled = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def traceparent(self) -> Optional[str]:
+        return None
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_CURRENT_SPAN: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Creates spans and hands finished, sampled spans to an output stream."""
+
+    def __init__(self, output: Optional[TextIO], sample_ratio: float = 1.0, service: str = "roast-my-life") -> None:
+        self.output = output
+        self.sample_ratio = sample_ratio
+        self.service = service
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.output is not None
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None, traceparent: Optional[str] = None):
+        """Start a span, child of the current span (or of `traceparent`, or a new root).
+
+        Parameters:
+            name (str): Operation name, e.g. "GET /form" or "cache.get".
+            attributes (Optional[Dict[str, Any]]): Initial span attributes.
+            traceparent (Optional[str]): Incoming W3C header, used only for root spans.
+
+        Returns:
+            Span, or NOOP_SPAN when tracing is disabled. Use with `with`.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        attributes = dict(attributes or {})
+        parent = _CURRENT_SPAN.get()
+        if parent is not None:
+            return Span(self, name, parent.trace_id, parent.span_id, parent.sampled, attributes)
+
+        match = _TRACEPARENT.match(traceparent or "")
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            sampled = bool(int(flags, 16) & 1)
+        else:
+            trace_id, parent_id = "%032x" % random.getrandbits(128), None
+            sampled = random.random() < self.sample_ratio
+        return Span(self, name, trace_id, parent_id, sampled, attributes)
+
+    def inject(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """Add the current span's `traceparent` to outgoing request headers."""
+        span = _CURRENT_SPAN.get()
+        if span is not None:
+            headers["traceparent"] = span.traceparent()
+        return headers
+
+    def export(self, span: Span) -> None:
+        record = {
+            "service": self.service,
+            "name": span.name,
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "start": span.start,
+            "duration_ms": round((span.end - span.start) * 1000, 3),
+            "status": span.status,
+            "attributes": span.attributes,
+        }
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+
+def create_tracer_from_env() -> Tracer:
+    """Build the tracer selected by the TRACING_* environment variables."""
+    exporter = os.environ.get("TRACING_EXPORTER", "none").lower()
+    ratio = float(os.environ.get("TRACING_SAMPLE_RATIO", "1.0"))
+    if exporter == "console":
+        return Tracer(sys.stderr, ratio)
+    if exporter == "file":
+        return Tracer(open(os.environ.get("TRACING_FILE", "traces.jsonl"), "a", encoding="utf-8"), ratio)
+    return Tracer(None, ratio)
@@ -14,9 +14,12 @@ Environment:
 
 import json
 import os
+import sys
 
 import streamlit as st
-from openai import OpenAI
+
+# Shared helpers (e.g. the client-side rate limiter) live in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # -------- Streamlit page setup --------
 st.set_page_config(page_title="Reka Research – Streaming Demo")
@@ -25,13 +28,49 @@ st.title("Reka Research – Streaming Demo")
 
 # -------- Reka / OpenAI client setup --------
 API_KEY = os.getenv("REKA_API_KEY", "your_api_key_here")
-client = OpenAI(
-    base_url="https://api.reka.ai/v1",
-    api_key=API_KEY,
-)
-
 MODEL = "reka-flash-research"
 
+
+@st.cache_resource
+def get_client():
+    # Imported lazily so the page renders before the openai SDK is loaded.
+    from openai import OpenAI
+    from research_helpers.ratelimit import rate_limited_http_client
+
+    return OpenAI(
+        base_url="https://api.reka.ai/v1",
+        api_key=API_KEY,
+        http_client=rate_limited_http_client(),
+    )
+
+
+def render_stream(stream, steps_box) -> None:
+    """Write each streamed reasoning step, tool call and answer chunk to `steps_box`."""
+    for chunk in stream:
+        delta = chunk.choices[0].delta
+
+        if delta.reasoning_steps:
+            # Show every field separately and immediately
+            step = delta.reasoning_steps[-1]
+
+            # textual reasoning (reasoning_content)
+            text_piece = step.get("reasoning_content")
+            if text_piece:
+                steps_box.markdown(text_piece)
+
+            # any tool calls
+            if step.get("tool_calls"):
+                tool_json = json.dumps(step["tool_calls"], indent=2)
+                steps_box.markdown(f"```json\n{tool_json}\n```")
+
+        else:
+            if delta.reasoning_content:
+                steps_box.markdown(delta.reasoning_content)
+                steps_box.divider()
+            if delta.content:
+                steps_box.markdown(delta.content)
+
+
 prompt = st.chat_input("Ask a research question…")
 
 if prompt:
@@ -44,7 +83,7 @@ if prompt:
         steps_box = st.container()  # each reasoning step will be printed here
 
     # Call Reka with streaming enabled
-    stream = client.chat.completions.create(
+    stream = get_client().chat.completions.create(
         model=MODEL,
         messages=[{"role": "user", "content": prompt}],
         stream=True,
@@ -52,26 +91,4 @@ if prompt:
 
     # Stream reasoning_steps one‑by‑one with a spinner
     with steps_box, st.spinner("Assistant is thinking…"):
-        for chunk in stream:
-            delta = chunk.choices[0].delta
-
-            if delta.reasoning_steps:
-                # Show every field separately and immediately
-                step = delta.reasoning_steps[-1]
-
-                # textual reasoning (reasoning_content)
-                text_piece = step.get("reasoning_content")
-                if text_piece:
-                    steps_box.markdown(text_piece)
-
-                # any tool calls
-                if step.get("tool_calls"):
-                    tool_json = json.dumps(step["tool_calls"], indent=2)
-                    steps_box.markdown(f"```json\n{tool_json}\n```")
-
-            else:
-                if delta.reasoning_content:
-                    steps_box.markdown(delta.reasoning_content)
-                    steps_box.divider()
-                if delta.content:
-                    steps_box.markdown(delta.content)
+        render_stream(stream, steps_box)